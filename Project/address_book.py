@@ -1,31 +1,152 @@
+import calendar
+from bisect import bisect_left, insort
 from collections import UserDict
-from datetime import datetime, timedelta
-from fields import DATE_FORMAT
+from datetime import date, datetime, timedelta
+from fields import DATE_FORMAT, Name
 from record import Record
 
+
+def name_key(name: str) -> str:
+    return name.casefold()
+
+
 class AddressBook(UserDict):
     def __init__(self):
+        # Secondary index: casefolded name -> ids of records with that name, oldest first
+        self._name_index: dict[str, list[int]] = {}
+        # Reverse phone index: phone -> records that have it (a shared landline may belong to several)
+        self._phone_index: dict[str, list[Record]] = {}
+        # Sorted phones for prefix search; built on the first search, then kept up to date with insort
+        self._sorted_phones: list[str] | None = None
+        # Birthday calendar: (month, day) -> records born on that day
+        self._birthday_index: dict[tuple[int, int], list[Record]] = {}
         super().__init__()
         self.last_id = 0
 
+    def __setitem__(self, key: int, record: Record) -> None:
+        if key in self.data:
+            self._unindex(key, self.data[key])
+        self.data[key] = record
+        self._index(key, record)
+
+    def __delitem__(self, key: int) -> None:
+        self._unindex(key, self.data.pop(key))
+
+    def __setstate__(self, state: dict) -> None:
+        # Books pickled before the indexes existed get fresh indexes
+        self.__dict__.update(state)
+        self._reindex()
+
+    def __copy__(self) -> "AddressBook":
+        # UserDict.__copy__ copies __dict__ shallowly, so the copy must not share our indexes
+        book = super().__copy__()
+        book._reindex()
+        return book
+
+    def _reindex(self) -> None:
+        self._name_index = {}
+        self._phone_index = {}
+        self._sorted_phones = None
+        self._birthday_index = {}
+        for key, record in self.data.items():
+            self._index(key, record)
+
+    def _index(self, key: int, record: Record) -> None:
+        self._name_index.setdefault(name_key(record.name.value), []).append(key)
+        record.attach(self)
+        for phone in record.phones:
+            self._add_phone(record, phone.value)
+        self._add_birthday(record, record.birthday_key())
+
+    def _unindex(self, key: int, record: Record) -> None:
+        name = name_key(record.name.value)
+        keys = self._name_index[name]
+        keys.remove(key)
+        if not keys:
+            del self._name_index[name]
+        record.detach(self)
+        for phone in record.phones:
+            self._remove_phone(record, phone.value)
+        self._remove_birthday(record, record.birthday_key())
+
+    def _add_phone(self, record: Record, phone: str) -> None:
+        records = self._phone_index.get(phone)
+        if records is None:
+            self._phone_index[phone] = [record]
+            if self._sorted_phones is not None:
+                insort(self._sorted_phones, phone)
+        else:
+            records.append(record)
+
+    def _remove_phone(self, record: Record, phone: str) -> None:
+        records = self._phone_index.get(phone, [])
+        for i, owner in enumerate(records):
+            if owner is record:
+                del records[i]
+                break
+        if not records and phone in self._phone_index:
+            del self._phone_index[phone]
+            if self._sorted_phones is not None:
+                del self._sorted_phones[bisect_left(self._sorted_phones, phone)]
+
+    def _add_birthday(self, record: Record, key: tuple[int, int] | None) -> None:
+        if key is not None:
+            self._birthday_index.setdefault(key, []).append(record)
+
+    def _remove_birthday(self, record: Record, key: tuple[int, int] | None) -> None:
+        records = self._birthday_index.get(key, [])
+        for i, owner in enumerate(records):
+            if owner is record:
+                del records[i]
+                break
+        if not records:
+            self._birthday_index.pop(key, None)
+
+    def has_phone(self, record: Record, phone: str) -> bool:
+        return any(owner is record for owner in self._phone_index.get(phone, ()))
+
+    def find_by_phone(self, phone: str) -> list[Record]:
+        return list(self._phone_index.get(phone.strip(), ()))
+
+    def search_phones(self, prefix: str) -> list[Record]:
+        prefix = prefix.strip()
+        if self._sorted_phones is None:
+            self._sorted_phones = sorted(self._phone_index)
+        result = []
+        seen = set()
+        for i in range(bisect_left(self._sorted_phones, prefix), len(self._sorted_phones)):
+            phone = self._sorted_phones[i]
+            if not phone.startswith(prefix):
+                break
+            for record in self._phone_index[phone]:
+                if id(record) not in seen:
+                    seen.add(id(record))
+                    result.append(record)
+        return result
+
     def add_record(self, record: Record) -> None:
         self.last_id += 1
-        self.data[self.last_id] = record
+        self[self.last_id] = record
 
     def find(self, name: str) -> Record | None:
-        return next(
-            (record for record in self.data.values() if record.name.value == name), 
-            None
-        )
+        keys = self._name_index.get(name_key(name))
+        return self.data[keys[0]] if keys else None
 
     def delete(self, name: str) -> None:
-        key = next(
-            (key for key in self.data.keys() if self.data[key].name.value == name), 
-            None
-        )
-        if not key:
+        keys = self._name_index.get(name_key(name))
+        if not keys:
             raise ValueError(f'Record with name {name} not found in contacts')
-        del self.data[key]
+        del self[keys[0]]
+
+    def rename(self, old_name: str, new_name: str) -> None:
+        keys = self._name_index.get(name_key(old_name))
+        if not keys:
+            raise ValueError(f'Record with name {old_name} not found in contacts')
+        key = keys[0]
+        record = self.data[key]
+        self._unindex(key, record)
+        record.name = Name(new_name)
+        self._index(key, record)
 
     def add_birthday(self, name: str, birthday_str: str) -> None:
         record = self.find(name)
@@ -37,36 +158,42 @@ class AddressBook(UserDict):
         except ValueError:
             raise ValueError(f'Invalid date format. Please use {DATE_FORMAT}')
         
-        record.birthday = birthday
+        # Record.add_birthday stores a Birthday field and updates the birthday index
+        record.add_birthday(birthday_str)
         print(f'Birthday for {name} set to {birthday.strftime(DATE_FORMAT)}')
 
+    def _birthdays_on(self, day: date) -> list[Record]:
+        records = list(self._birthday_index.get((day.month, day.day), ()))
+        # In non-leap years people born on 29 February are congratulated on the 28th
+        if day.month == 2 and day.day == 28 and not calendar.isleap(day.year):
+            records.extend(self._birthday_index.get((2, 29), ()))
+        return records
 
-    def get_upcoming_birthdays(self) -> list[dict]:
-        result = []
-        current_date = datetime.today()
-        current_year = current_date.year
-
-        for record in self.data.values():
-            if not record.birthday:
-                continue
-            
-            birthdate = record.birthday.value.replace(year=current_year)
-            if birthdate < current_date:
-                birthdate = birthdate.replace(year=current_year + 1)
-
-            if (birthdate - current_date).days > 7:
-                continue
-
-            congratulation_date = birthdate
-            weekday = birthdate.weekday()
-            if weekday == 5:
-                congratulation_date += timedelta(days=2)
-            elif weekday == 6:
-                congratulation_date += timedelta(days=1)
-
-            result.append({
-                "name": record.name.value,
-                "congratulation_date": datetime.strftime(congratulation_date, DATE_FORMAT)
-            })
+    def get_upcoming_birthdays(self, days: int = 7, today: date | None = None) -> list[dict]:
+        return self.get_upcoming_birthdays_batch([(today or date.today(), days)])[0]
 
-        return result
+    def get_upcoming_birthdays_batch(self, windows: list[tuple[date, int]]) -> list[list[dict]]:
+        # Each window covers its start date and the following `days` days; days shared
+        # by several windows are looked up once
+        congratulations: dict[date, list[tuple[str, str]]] = {}
+        results = []
+        for start, days in windows:
+            result = []
+            for offset in range(days + 1):
+                day = start + timedelta(days=offset)
+                entries = congratulations.get(day)
+                if entries is None:
+                    congratulation_date = day
+                    weekday = day.weekday()
+                    if weekday == 5:
+                        congratulation_date += timedelta(days=2)
+                    elif weekday == 6:
+                        congratulation_date += timedelta(days=1)
+                    formatted = congratulation_date.strftime(DATE_FORMAT)
+                    entries = congratulations[day] = [
+                        (record.name.value, formatted) for record in self._birthdays_on(day)
+                    ]
+                result.extend({"name": name, "congratulation_date": formatted} for name, formatted in entries)
+            results.append(result)
+
+        return results
@@ -4,6 +4,9 @@ from fields import DATE_FORMAT
 
 
 class Record:
+    # Address books that index this record; they are told about phone changes
+    _books: tuple = ()
+
     def __init__(self, name: str) -> None:
         self.name = Name(name)
         self.phones = []
@@ -11,28 +14,46 @@ class Record:
         self.email = None
         self.address = None
 
+    def attach(self, book) -> None:
+        if not any(b is book for b in self._books):
+            self._books = self._books + (book,)
+
+    def detach(self, book) -> None:
+        self._books = tuple(b for b in self._books if b is not book)
+
+    def has_phone(self, phone: str) -> bool:
+        if self._books:
+            return self._books[0].has_phone(self, phone)
+        return any(p.value == phone for p in self.phones)
+
     def add_phone(self, phone: str) -> None:
         phone = phone.strip()
-        found = False
-        try:
-            self.find_phone(phone)
-            found = True
-        except:
-            pass
-
-        if found:
+        if self.has_phone(phone):
             raise ValueError(f'Phone {phone} already exists in contacts')
 
         self.phones.append(Phone(phone))
+        for book in self._books:
+            book._add_phone(self, phone)
 
     def remove_phone(self, phone: str) -> None:
         phone = phone.strip()
-        self.phones = [p for p in self.phones if p.value != phone]
+        if self.has_phone(phone):
+            self.phones = [p for p in self.phones if p.value != phone]
+            for book in self._books:
+                book._remove_phone(self, phone)
         print(f'Phone {phone} successfully removed')
 
     def edit_phone(self, old_phone: str, new_phone: str) -> None:
-        found_phone = self.find_phone(old_phone.strip())
-        found_phone.value = new_phone
+        old_phone, new_phone = old_phone.strip(), new_phone.strip()
+        found_phone = self.find_phone(old_phone)
+        if new_phone != old_phone and self.has_phone(new_phone):
+            raise ValueError(f'Phone {new_phone} already exists in contacts')
+
+        # Validate before touching the record or the book indexes
+        found_phone.value = Phone(new_phone).value
+        for book in self._books:
+            book._remove_phone(self, old_phone)
+            book._add_phone(self, new_phone)
         print(f'New phone {new_phone} successfully replaced old phone {old_phone}')
 
     def find_phone(self, phone: str) -> Phone:
@@ -44,7 +65,19 @@ class Record:
         return found_phone
 
     def add_birthday(self, birthdate: str) -> None:
-        self.birthday = Birthday(birthdate)
+        birthday = Birthday(birthdate)
+        for book in self._books:
+            book._remove_birthday(self, self.birthday_key())
+        self.birthday = birthday
+        for book in self._books:
+            book._add_birthday(self, self.birthday_key())
+
+    def birthday_key(self) -> tuple[int, int] | None:
+        if self.birthday is None:
+            return None
+        # Books saved before AddressBook.add_birthday stored a Birthday field may hold the raw datetime
+        birthday = getattr(self.birthday, 'value', self.birthday)
+        return birthday.month, birthday.day
 
     def get_birthday(self) -> str:
         return (datetime.strftime(self.birthday.value, DATE_FORMAT)
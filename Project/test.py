@@ -102,5 +102,104 @@ class TestAssistantBot(unittest.TestCase):
     def tearDown(self):
         pass
 
+class TestAddressBookIndexes(unittest.TestCase):
+
+    def setUp(self):
+        self.book = AddressBook()
+        for name in ['John Doe', 'Jane Doe']:
+            self.book.add_record(Record(name))
+
+    def test_find_is_case_insensitive(self):
+        self.assertEqual(self.book.find('john doe').name.value, 'John Doe')
+        self.assertIsNone(self.book.find('Jim Doe'))
+
+    def test_delete_updates_name_index(self):
+        self.book.delete('JANE DOE')
+        self.assertIsNone(self.book.find('Jane Doe'))
+        self.assertEqual(len(self.book), 1)
+        with self.assertRaises(ValueError):
+            self.book.delete('Jane Doe')
+
+    def test_rename_updates_name_index(self):
+        self.book.rename('John Doe', 'Johnny Doe')
+        self.assertIsNone(self.book.find('John Doe'))
+        self.assertEqual(self.book.find('johnny doe').name.value, 'Johnny Doe')
+
+    def test_userdict_interface_keeps_index(self):
+        self.book[10] = Record('Jim Doe')
+        self.assertIs(self.book.find('Jim Doe'), self.book[10])
+        del self.book[10]
+        self.assertIsNone(self.book.find('Jim Doe'))
+        copied = self.book.copy()
+        copied.delete('John Doe')
+        self.assertIsNotNone(self.book.find('John Doe'))
+
+    @patch('builtins.print')
+    def test_phone_index_follows_record_changes(self, mock_print):
+        record = self.book.find('John Doe')
+        record.add_phone('0501234567')
+        self.assertEqual(self.book.find_by_phone('0501234567'), [record])
+        with self.assertRaises(ValueError):
+            record.add_phone('0501234567')
+        record.edit_phone('0501234567', '0671234567')
+        self.assertEqual(self.book.find_by_phone('0501234567'), [])
+        self.assertEqual(self.book.find_by_phone('0671234567'), [record])
+        record.remove_phone('0671234567')
+        self.assertEqual(self.book.find_by_phone('0671234567'), [])
+
+    @patch('builtins.print')
+    def test_edit_phone_validates_before_changing(self, mock_print):
+        record = self.book.find('John Doe')
+        record.add_phone('0501234567')
+        record.add_phone('0671234567')
+        with self.assertRaises(ValueError):
+            record.edit_phone('0501234567', '0671234567')
+        with self.assertRaises(ValueError):
+            record.edit_phone('0501234567', '12ab')
+        self.assertEqual(record.show_phones(), '0501234567; 0671234567')
+        self.assertEqual(self.book.find_by_phone('0501234567'), [record])
+        self.assertEqual(self.book.find_by_phone('0671234567'), [record])
+        # Editing a phone to its own value is allowed, as before
+        record.edit_phone('0501234567', '0501234567')
+        self.assertEqual(record.show_phones(), '0501234567; 0671234567')
+        self.assertEqual(self.book.find_by_phone('0501234567'), [record])
+
+    def test_search_phones_by_prefix(self):
+        john = self.book.find('John Doe')
+        jane = self.book.find('Jane Doe')
+        john.add_phone('0501234567')
+        jane.add_phone('0509999999')
+        jane.add_phone('0671111111')
+        self.assertEqual(self.book.search_phones('050'), [john, jane])
+        self.assertEqual(self.book.search_phones('067'), [jane])
+        self.book.delete('Jane Doe')
+        self.assertEqual(self.book.search_phones('0'), [john])
+
+    @patch('builtins.print')
+    def test_upcoming_birthdays_window(self, mock_print):
+        self.book.add_birthday('John Doe', '01.03.1990')
+        self.book.add_birthday('Jane Doe', '10.03.1990')
+        # 01.03.2025 is a Saturday, so the congratulation moves to Monday
+        upcoming = self.book.get_upcoming_birthdays(days=3, today=datetime(2025, 2, 27).date())
+        self.assertEqual(upcoming, [{'name': 'John Doe', 'congratulation_date': '03.03.2025'}])
+        self.assertEqual(len(self.book.get_upcoming_birthdays(days=14, today=datetime(2025, 2, 27).date())), 2)
+
+    @patch('builtins.print')
+    def test_leap_day_birthday_in_common_year(self, mock_print):
+        self.book.add_birthday('John Doe', '29.02.1992')
+        common = self.book.get_upcoming_birthdays(days=0, today=datetime(2023, 2, 28).date())
+        leap = self.book.get_upcoming_birthdays(days=0, today=datetime(2024, 2, 28).date())
+        self.assertEqual(common, [{'name': 'John Doe', 'congratulation_date': '28.02.2023'}])
+        self.assertEqual(leap, [])
+
+    @patch('builtins.print')
+    def test_birthday_index_batch_and_updates(self, mock_print):
+        self.book.add_birthday('John Doe', '05.06.1990')
+        self.book.find('John Doe').add_birthday('06.06.1990')
+        windows = [(datetime(2025, 6, 5).date(), 0), (datetime(2025, 6, 5).date(), 1)]
+        self.assertEqual([len(result) for result in self.book.get_upcoming_birthdays_batch(windows)], [0, 1])
+        self.book.delete('John Doe')
+        self.assertEqual(self.book.get_upcoming_birthdays(days=1, today=datetime(2025, 6, 5).date()), [])
+
 if __name__ == '__main__':
     unittest.main()
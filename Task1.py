@@ -3,7 +3,26 @@ import shutil
 import argparse
 from pathlib import Path
 import sys
-import fnmatch
+import re
+import threading
+import json
+import hashlib
+import errno
+import asyncio
+import logging
+import logging.handlers
+import queue
+import time
+import tarfile
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, wait
+
+logger = logging.getLogger("Task1")
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
 
 # Список системних файлів та директорій для ігнорування
 IGNORE_FILES = {
@@ -24,100 +43,1615 @@ IGNORE_DIRS = {
     '.vscode',
 }
 
+# Файл маніфесту інкрементального режиму (створюється в корені директорії призначення)
+MANIFEST_NAME = '.sort_manifest.jsonl'
+
+# Звіт про знайдені дублікати в режимі --dedupe report
+DEDUPE_REPORT_NAME = '.dedupe_report.jsonl'
+
+# Результат Deduplicator.place для дубліката, який у режимі report лише записано у звіт
+REPORTED = object()
+
+# Розмір блоку читання при хешуванні вмісту файлів
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# ioctl для клонування файлу (reflink) на Btrfs/XFS: _IOW(0x94, 9, int)
+FICLONE = 0x40049409
+
+# Стратегії копіювання даних у порядку спроб для режиму "auto"
+COPY_STRATEGIES = ('reflink', 'copy_file_range', 'sendfile', 'buffered')
+
+# Розмір блоку читання/запису в асинхронному режимі
+ASYNC_CHUNK_SIZE = 1024 * 1024
+
+# Обмеження одночасних операцій для стадій асинхронного режиму: перегляд директорій, читання, запис
+ASYNC_LIMITS = (8, 64, 64)
+
+# Архіви, члени яких можна розкласти за розширеннями без розпакування на диск
+ARCHIVE_SUFFIXES = ('.zip', '.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz')
+
+# Способи розміщення файлу в директорії призначення
+TRANSFER_MODES = ('copy', 'move', 'hardlink', 'symlink')
+
+# Політики розв'язання конфліктів імен у піддиректорії розширення
+COLLISION_POLICIES = ('suffix', 'hash', 'newest', 'skip', 'overwrite')
+
+# Коди помилок, після яких стратегія вимикається до кінця запуску
+UNSUPPORTED_ERRNOS = {errno.ENOSYS, errno.EOPNOTSUPP, errno.ENOTTY, errno.EPERM}
+
 def parse_arguments():
     """
     Парсинг аргументів командного рядка.
-    Повертає шлях до вихідної директорії, шлях до директорії призначення та прапорець тесту.
+    Повертає простір імен з шляхом до вихідної директорії, шляхом до директорії призначення,
+    прапорцем тесту та параметрами режимів копіювання.
     """
     parser = argparse.ArgumentParser(description="Рекурсивно копіює файли та сортує їх за розширеннями, ігноруючи системні файли.")
     parser.add_argument("source", type=str, nargs='?', help="Шлях до вихідної директорії.")
     parser.add_argument("destination", nargs='?', default=None, type=str, help="Шлях до директорії призначення.")
     parser.add_argument("--test", action="store_true", help="Запустити тестове копіювання на визначеній директорії.")
+    parser.add_argument("--plan", action="store_true",
+                        help="Лише оцінити роботу: кількість файлів, обсяг та очікувані конфлікти імен для кожного розширення.")
+    parser.add_argument("--workers", type=int, default=1, help="Кількість потоків копіювання (1 - послідовне копіювання).")
+    parser.add_argument("--dedupe", choices=("hardlink", "report"), default=None,
+                        help="Зберігати однаковий вміст лише один раз: дублікати стають жорсткими посиланнями або записуються у звіт.")
+    parser.add_argument("--copy-strategy", choices=("auto",) + COPY_STRATEGIES, default="auto",
+                        help="Спосіб копіювання даних: auto пробує reflink, copy_file_range, sendfile, а потім звичайне копіювання.")
+    parser.add_argument("--mode", choices=TRANSFER_MODES, default="copy",
+                        help="Копіювати, переміщувати або створювати посилання. move і hardlink на іншому пристрої виконуються копіюванням.")
+    parser.add_argument("--on-collision", choices=COLLISION_POLICIES, default="suffix",
+                        help="Що робити з однаковими іменами: додати номер, додати хеш, лишити новіший, пропустити або перезаписати.")
+    parser.add_argument("--ignore-file", action="append", default=[],
+                        help="Файл з додатковими правилами ігнорування у форматі .gitignore (можна вказати кілька разів).")
+    parser.add_argument("--log-level", choices=("DEBUG", "INFO", "WARNING", "ERROR"), default="INFO",
+                        help="Рівень повідомлень у консолі (DEBUG - рядок на кожен файл).")
+    parser.add_argument("--log-json", default=None, help="Файл для журналу у форматі JSON lines (усі події, включно з DEBUG).")
+    parser.add_argument("--progress-interval", type=float, default=2.0,
+                        help="Інтервал у секундах між повідомленнями про прогрес (0 - вимкнути).")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="Асинхронний конвеєр (перегляд директорій, читання, запис) для джерел з великою затримкою.")
+    parser.add_argument("--async-limits", type=int, nargs=3, default=list(ASYNC_LIMITS),
+                        metavar=("LIST", "READ", "WRITE"),
+                        help="Кількість одночасних операцій для кожної стадії асинхронного режиму.")
+    parser.add_argument("--archives", action="store_true",
+                        help="Розкладати вміст zip/tar архівів за розширеннями напряму з потоку, без розпакування на диск.")
+    parser.add_argument("--incremental", action="store_true", help="Пропускати файли, які не змінилися з попереднього запуску (за маніфестом).")
     args = parser.parse_args()
-    return args.source, args.destination, args.test
+    if args.workers < 1:
+        parser.error("--workers має бути не менше 1.")
+    if min(args.async_limits) < 1:
+        parser.error("--async-limits мають бути не менше 1.")
+    if args.use_async and (args.dedupe or args.mode != "copy" or args.archives):
+        parser.error("--async підтримує лише --mode copy без --dedupe та --archives.")
+    if args.use_async and args.copy_strategy != "auto":
+        parser.error("--async завжди копіює буферизовано, --copy-strategy з ним не використовується.")
+    return args
+
+def _glob_to_regex(pattern: str) -> str:
+    """
+    Перетворює шаблон у стилі .gitignore на регулярний вираз.
+    '*' і '?' не переходять через '/', '**' відповідає будь-якій кількості директорій.
+
+    :param pattern: Шаблон без '!' на початку та '/' у кінці.
+    :return: Рядок регулярного виразу (лише з незахоплюючими групами).
+    """
+    out = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == '*':
+            if pattern.startswith('**/', i):
+                out.append('(?:.*/)?')
+                i += 3
+                continue
+            if pattern.startswith('**', i):
+                out.append('.*')
+                i += 2
+                continue
+            out.append('[^/]*')
+        elif char == '?':
+            out.append('[^/]')
+        elif char == '[':
+            close = pattern.find(']', i + 2)
+            if close == -1:
+                out.append(re.escape(char))
+            else:
+                body = pattern[i + 1:close]
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                out.append('[' + body.replace('\\', '\\\\') + ']')
+                i = close
+        elif char == '\\' and i + 1 < len(pattern):
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(char))
+        i += 1
+    return ''.join(out)
 
-def is_ignored(file_or_dir: Path) -> bool:
+class IgnoreRules:
+    """
+    Набір правил ігнорування у синтаксисі .gitignore, скомпільований один раз.
+
+    Правила без шаблонних символів потрапляють у словники (за ім'ям або за шляхом від
+    кореня), а решта - в один регулярний вираз, де альтернативи записані у зворотному
+    порядку. Тому для кожного запису потрібні два пошуки у словнику та один виклик
+    регулярного виразу, а правило, що спрацювало, завжди останнє з відповідних -
+    так само, як у git, зокрема для заперечень ('!').
+
+    Підтримуються коментарі ('#'), заперечення ('!'), правила лише для директорій
+    (закінчуються на '/'), прив'язані до кореня правила (містять '/') та '**'.
+    """
+
+    def __init__(self, include_defaults: bool = True):
+        self._rules = []
+        self._compiled = None
+        if include_defaults:
+            # Сховані файли та директорії (починаються з крапки)
+            self.add('.*')
+            for name in sorted(IGNORE_FILES):
+                self.add(name)
+            for name in sorted(IGNORE_DIRS):
+                self.add(name, dir_only=True)
+
+    def add(self, pattern: str, negated: bool = False, dir_only: bool = False, anchored: bool = False):
+        """
+        Додає одне правило без розбору синтаксису .gitignore.
+
+        :param pattern: Шаблон імені або шляху від кореня.
+        :param negated: Правило повертає раніше проігнорований запис.
+        :param dir_only: Правило діє лише на директорії.
+        :param anchored: Шаблон порівнюється з повним шляхом від кореня, а не лише з ім'ям.
+        """
+        text = ('!' if negated else '') + ('/' if anchored else '') + pattern + ('/' if dir_only else '')
+        self._rules.append((text, negated, dir_only, anchored, pattern))
+        self._compiled = None
+
+    def add_line(self, line: str):
+        """
+        Додає правило з рядка у форматі .gitignore.
+
+        :param line: Рядок файлу правил.
+        """
+        line = line.rstrip('\n')
+        if not line.endswith('\\ '):
+            line = line.rstrip()
+        if not line or line.startswith('#'):
+            return
+        negated = line.startswith('!')
+        if negated:
+            line = line[1:]
+        dir_only = line.endswith('/')
+        line = line.rstrip('/')
+        anchored = '/' in line
+        line = line.lstrip('/')
+        if line:
+            self.add(line, negated, dir_only, anchored)
+
+    def load(self, path):
+        """
+        Додає всі правила з файлу у форматі .gitignore.
+
+        :param path: Шлях до файлу правил.
+        """
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                self.add_line(line)
+
+    def _compile(self):
+        tables = []
+        for for_dirs in (False, True):
+            names, paths, alternatives = {}, {}, []
+            for index, (_, _, dir_only, anchored, pattern) in enumerate(self._rules):
+                if dir_only and not for_dirs:
+                    continue
+                if not any(char in pattern for char in '*?[\\'):
+                    # Пізніше правило має пріоритет, тому індекс просто перезаписується
+                    (paths if anchored else names)[pattern] = index
+                    continue
+                regex = _glob_to_regex(pattern)
+                if not anchored:
+                    regex = '(?:.*/)?' + regex
+                alternatives.append(f'(?P<r{index}>{regex})')
+            regex = re.compile('|'.join(reversed(alternatives)), re.DOTALL) if alternatives else None
+            tables.append((names, paths, regex))
+        self._compiled = tables
+
+    def match(self, rel_path: str, is_dir: bool = False):
+        """
+        Перевіряє запис за шляхом від кореня обходу.
+
+        :param rel_path: Шлях від кореня з '/' як роздільником.
+        :param is_dir: Чи є запис директорією.
+        :return: Текст правила, через яке запис ігнорується, або None.
+        """
+        if self._compiled is None:
+            self._compile()
+        names, paths, regex = self._compiled[is_dir]
+        name = rel_path.rsplit('/', 1)[-1]
+        winner = max(names.get(name, -1), paths.get(rel_path, -1))
+        if regex is not None:
+            found = regex.fullmatch(rel_path)
+            if found is not None:
+                winner = max(winner, int(found.lastgroup[1:]))
+        if winner < 0 or self._rules[winner][1]:
+            return None
+        return self._rules[winner][0]
+
+# Правила за замовчуванням, побудовані з IGNORE_FILES та IGNORE_DIRS
+DEFAULT_IGNORE_RULES = IgnoreRules()
+
+def is_ignored(file_or_dir) -> bool:
     """
     Перевіряє, чи є файл або директорія системним або схованим і повинен бути ігнорований.
 
-    :param file_or_dir: Path об'єкт файлу або директорії.
+    :param file_or_dir: Path або os.DirEntry об'єкт файлу або директорії.
     :return: True, якщо файл або директорія повинні бути ігноровані, інакше False.
     """
-    name = file_or_dir.name
+    return DEFAULT_IGNORE_RULES.match(file_or_dir.name) is not None
 
-    # Ігнорування схованих файлів та директорій (починаються з крапки)
-    if name.startswith('.'):
-        return True
+def bucket_for(file_path: Path) -> str:
+    """
+    Визначає назву піддиректорії для файлу за його розширенням.
 
-    # Ігнорування специфічних файлів
-    if name in IGNORE_FILES:
-        return True
+    :param file_path: Path об'єкт вихідного файлу.
+    :return: Розширення без крапки в нижньому регістрі або "no_extension".
+    """
+    # Отримуємо розширення файлу без крапки, якщо воно є
+    return file_path.suffix[1:].lower() if file_path.suffix else "no_extension"
 
-    # Додавання підтримки шаблонів (наприклад, '._*.swp')
-    for pattern in IGNORE_FILES:
-        if '*' in pattern:
-            if fnmatch.fnmatch(name, pattern):
-                return True
+def destination_for(file_path: Path, destination_root: Path) -> Path:
+    """
+    Визначає шлях файлу в директорії призначення (піддиректорія за розширенням).
+
+    :param file_path: Path об'єкт вихідного файлу.
+    :param destination_root: Path об'єкт кореневої директорії призначення.
+    :return: Path об'єкт файлу в директорії призначення.
+    """
+    return destination_root / bucket_for(file_path) / file_path.name
+
+def replace_with_link(make_link, source, target: Path):
+    """
+    Створює посилання на місці target, замінюючи наявний файл атомарно.
+
+    :param make_link: os.link або os.symlink.
+    :param source: Шлях, на який вказує посилання.
+    :param target: Path об'єкт посилання.
+    """
+    tmp_target = target.with_name(f".{target.name}.{threading.get_ident()}.tmp")
+    make_link(source, tmp_target)
+    try:
+        os.replace(tmp_target, target)
+    except OSError:
+        os.unlink(tmp_target)
+        raise
+
+class FileCopier:
+    """
+    Копіювання даних файлу з найшвидшою доступною стратегією.
+
+    Спочатку пробується клонування (reflink/FICLONE), потім копіювання в ядрі
+    (os.copy_file_range, os.sendfile) і лише в останню чергу звичайне буферизоване
+    копіювання. Стратегія, яку не підтримує система, вимикається до кінця запуску.
+    Метадані копіюються так само, як у shutil.copy2.
+
+    Режими move і hardlink на тому самому пристрої змінюють лише метадані файлової
+    системи (rename/link); між пристроями (EXDEV) вони виконуються копіюванням.
+    """
+
+    def __init__(self, strategy: str = "auto", mode: str = "copy"):
+        self.mode = mode
+        if strategy == "auto":
+            self._order = list(COPY_STRATEGIES)
+        elif strategy == "buffered":
+            self._order = ["buffered"]
+        else:
+            self._order = [strategy, "buffered"]
+        self._disabled = set()
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def copy(self, source: Path, target: Path):
+        """
+        Розміщує файл у директорії призначення відповідно до режиму (mode).
+
+        :param source: Path об'єкт вихідного файлу.
+        :param target: Path об'єкт файлу призначення.
+        """
+        if self.mode == "copy":
+            self._copy_data(source, target)
+            return
+
+        size = os.stat(source).st_size
+        try:
+            if self.mode == "move":
+                os.replace(source, target)
+            elif self.mode == "hardlink":
+                replace_with_link(os.link, source, target)
+            else:
+                replace_with_link(os.symlink, os.path.abspath(source), target)
+        except OSError as e:
+            if e.errno != errno.EXDEV or self.mode == "symlink":
+                raise
+            # Інший пристрій - переміщення та жорстке посилання неможливі без копіювання
+            self._copy_data(source, target)
+            if self.mode == "move":
+                os.unlink(source)
+            return
+        self.record(self.mode, size)
+
+    def _copy_data(self, source: Path, target: Path):
+        """
+        Копіює вміст і метадані файлу першою стратегією, яка спрацює.
 
-    return False
+        :param source: Path об'єкт вихідного файлу.
+        :param target: Path об'єкт файлу призначення.
+        """
+        if os.path.exists(target) and os.path.samefile(source, target):
+            # Ціль може бути жорстким посиланням на джерело з попереднього запуску (--mode hardlink)
+            raise shutil.SameFileError(f"'{source}' і '{target}' - той самий файл")
+        # Дані пишуться у тимчасовий файл поруч із ціллю і замінюють її атомарно, тому
+        # наявний файл (можливо, посилання на джерело чи інший файл) ніколи не змінюється на місці
+        tmp_target = target.with_name(f".{target.name}.{threading.get_ident()}.tmp")
+        try:
+            with open(source, "rb") as fsrc, open(tmp_target, "wb") as fdst:
+                size = os.fstat(fsrc.fileno()).st_size
+                for strategy in self._order:
+                    if strategy in self._disabled:
+                        continue
+                    try:
+                        getattr(self, f"_copy_{strategy}")(fsrc, fdst, size)
+                        break
+                    except OSError as e:
+                        if strategy == "buffered":
+                            raise
+                        if e.errno in UNSUPPORTED_ERRNOS:
+                            self._disabled.add(strategy)
+                        # Відкидаємо частково скопійовані дані перед наступною спробою
+                        fdst.seek(0)
+                        fdst.truncate()
+            shutil.copystat(source, tmp_target)
+            os.replace(tmp_target, target)
+        except BaseException:
+            if os.path.lexists(tmp_target):
+                os.unlink(tmp_target)
+            raise
+        self.record(strategy, size)
+
+    def record(self, strategy: str, size: int):
+        """
+        Додає файл до статистики стратегії.
+
+        :param strategy: Назва стратегії або режиму.
+        :param size: Розмір файлу в байтах.
+        """
+        with self._lock:
+            files, total = self._stats.get(strategy, (0, 0))
+            self._stats[strategy] = (files + 1, total + size)
+
+    @staticmethod
+    def _copy_reflink(fsrc, fdst, size):
+        if fcntl is None:
+            raise OSError(errno.ENOSYS, "reflink недоступний")
+        fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+
+    @staticmethod
+    def _copy_copy_file_range(fsrc, fdst, size):
+        if not hasattr(os, "copy_file_range"):
+            raise OSError(errno.ENOSYS, "copy_file_range недоступний")
+        offset = 0
+        while offset < size:
+            copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), size - offset, offset, offset)
+            if copied == 0:
+                # Ядро не скопіювало решту (файл зменшився або ФС не підтримує) - пробуємо наступну стратегію
+                raise OSError(errno.EIO, f"copy_file_range скопіював {offset} з {size} байт")
+            offset += copied
+
+    @staticmethod
+    def _copy_sendfile(fsrc, fdst, size):
+        if not hasattr(os, "sendfile"):
+            raise OSError(errno.ENOSYS, "sendfile недоступний")
+        offset = 0
+        while offset < size:
+            sent = os.sendfile(fdst.fileno(), fsrc.fileno(), offset, size - offset)
+            if sent == 0:
+                raise OSError(errno.EIO, f"sendfile скопіював {offset} з {size} байт")
+            offset += sent
+
+    @staticmethod
+    def _copy_buffered(fsrc, fdst, size):
+        fsrc.seek(0)
+        shutil.copyfileobj(fsrc, fdst)
+
+    def report(self):
+        """
+        Виводить, скільки файлів і байтів оброблено кожною стратегією.
+        """
+        for strategy in COPY_STRATEGIES + TRANSFER_MODES[1:] + ("archive",):
+            if strategy in self._stats:
+                files, total = self._stats[strategy]
+                logger.info("Стратегія %s: %d файлів, %d байт.", strategy, files, total,
+                            extra={"event": "strategy", "strategy": strategy, "files": files, "size": total})
+
+    def totals(self):
+        """
+        Повертає загальну кількість оброблених файлів і байтів за всіма стратегіями.
+        """
+        with self._lock:
+            return (sum(files for files, _ in self._stats.values()),
+                    sum(total for _, total in self._stats.values()))
 
-def copy_file(file_path: Path, destination_root: Path):
+def copy_file(file_path: Path, destination_root: Path, copier: FileCopier = None, target: Path = None):
     """
     Копіює файл у відповідну піддиректорію за розширенням.
+    Тип запису вже перевірено під час обходу (walk_source), тому повторний stat не робиться.
 
     :param file_path: Path об'єкт вихідного файлу.
     :param destination_root: Path об'єкт кореневої директорії призначення.
+    :param copier: Об'єкт FileCopier зі стратегією копіювання (None - shutil.copy2).
+    :param target: Шлях призначення, вже визначений індексом імен (None - destination_for).
+    :return: Шлях до скопійованого файлу або None, якщо копіювання не вдалося.
     """
     try:
-        if file_path.is_file():
-            # Отримуємо розширення файлу без крапки, якщо воно є
-            extension = file_path.suffix[1:].lower() if file_path.suffix else "no_extension"
-            # Створюємо піддиректорію за розширенням
-            target_dir = destination_root / extension
-            target_dir.mkdir(parents=True, exist_ok=True)
-            # Копіюємо файл до цільової директорії
-            shutil.copy2(file_path, target_dir / file_path.name)
-            print(f"Скопійовано: {file_path} -> {target_dir / file_path.name}")
+        if target is None:
+            target = destination_for(file_path, destination_root)
+        # Створюємо піддиректорію за розширенням
+        target.parent.mkdir(parents=True, exist_ok=True)
+        # Копіюємо файл до цільової директорії
+        if copier is None:
+            shutil.copy2(file_path, target)
+        else:
+            copier.copy(file_path, target)
+        logger.debug("Скопійовано: %s -> %s", file_path, target,
+                     extra={"event": "copied", "source": file_path, "destination": target})
+        return target
     except Exception as e:
-        print(f"Помилка при копіюванні файлу '{file_path}': {e}")
+        logger.error("Помилка при копіюванні файлу '%s': %s", file_path, e,
+                     extra={"event": "error", "source": file_path})
+        return None
+
+class Manifest:
+    """
+    Журнал скопійованих файлів: шлях джерела, розмір, час зміни та шлях призначення.
+
+    Кожен скопійований файл одразу дописується рядком JSON у кінець файлу, тому
+    перерваний запуск не втрачає вже виконану роботу і наступний продовжує з місця зупинки.
+    Наявність файлів у директорії призначення не перевіряється - рішення приймається
+    лише за маніфестом, без додаткових stat.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._load()
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    self._entries[record["source"]] = (record["size"], record["mtime_ns"], record["destination"])
+                except (ValueError, KeyError):
+                    # Недописаний рядок після аварійного завершення - файл буде скопійовано ще раз
+                    continue
+
+    def is_unchanged(self, source: str, stat: os.stat_result) -> bool:
+        """
+        Перевіряє, чи файл уже скопійовано і відтоді він не змінювався.
+
+        :param source: Шлях до вихідного файлу.
+        :param stat: Результат stat для вихідного файлу.
+        :return: True, якщо файл можна пропустити.
+        """
+        known = self._entries.get(source)
+        return known is not None and known[:2] == (stat.st_size, stat.st_mtime_ns)
+
+    def destination_of(self, source: str):
+        """
+        Повертає шлях, куди файл було розміщено в попередньому запуску.
+
+        :param source: Шлях до вихідного файлу.
+        :return: Path об'єкт у директорії призначення або None, якщо файл ще не копіювався.
+        """
+        known = self._entries.get(source)
+        # Дублікат у режимі --dedupe report відомий, але ніде не розміщений
+        return Path(known[2]) if known is not None and known[2] is not None else None
+
+    def destinations(self):
+        """
+        Повертає пари (шлях призначення, mtime_ns джерела) для всіх відомих файлів.
+        """
+        return [(Path(destination), mtime_ns) for _, mtime_ns, destination in self._entries.values()
+                if destination is not None]
+
+    def record(self, source: str, stat: os.stat_result, destination: Path):
+        """
+        Записує успішно скопійований файл у маніфест.
+
+        :param source: Шлях до вихідного файлу.
+        :param stat: Результат stat для вихідного файлу на момент копіювання.
+        :param destination: Шлях до файлу в директорії призначення (None - файл ніде не розміщено).
+        """
+        self.record_entry(source, stat.st_size, stat.st_mtime_ns, destination)
+
+    def record_entry(self, source: str, size: int, mtime_ns: int, destination: Path):
+        """
+        Записує файл у маніфест за вже відомими розміром і часом зміни (наприклад, член архіву).
+
+        :param source: Ключ джерела (шлях до файлу або "архів:член").
+        :param size: Розмір файлу в байтах.
+        :param mtime_ns: Час зміни в наносекундах.
+        :param destination: Шлях до файлу в директорії призначення (None - файл ніде не розміщено).
+        """
+        destination = os.fspath(destination) if destination is not None else None
+        line = json.dumps({
+            "source": source,
+            "size": size,
+            "mtime_ns": mtime_ns,
+            "destination": destination,
+        }, ensure_ascii=False)
+        with self._lock:
+            self._entries[source] = (size, mtime_ns, destination)
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def close(self):
+        """
+        Закриває маніфест і переписує його без застарілих записів.
+        """
+        self._file.close()
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for source, (size, mtime_ns, destination) in self._entries.items():
+                f.write(json.dumps({
+                    "source": source,
+                    "size": size,
+                    "mtime_ns": mtime_ns,
+                    "destination": destination,
+                }, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, self.path)
+
+def file_digest(path) -> str:
+    """
+    Обчислює SHA-256 вмісту файлу, читаючи його блоками.
+
+    :param path: Шлях до файлу.
+    :return: Шістнадцятковий рядок хешу.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class _Blob:
+    """
+    Унікальний вміст, уже розміщений (або який саме розміщується) в директорії призначення.
+    """
+
+    def __init__(self, source: Path, digest: str = None):
+        self.source = source
+        self.digest = digest
+        self.destination = None
+        self.ready = threading.Event()
 
-def recursive_copy(source_dir: Path, destination_root: Path):
+class Deduplicator:
     """
-    Рекурсивно перебирає директорію, копіює файли до директорії призначення,
+    Індекс вмісту для режиму --dedupe.
+
+    Файли спочатку групуються за розміром, а хеш рахується лише тоді, коли файл такого
+    розміру вже траплявся, тож більшість унікальних файлів не читається зайвий раз.
+    Кожен унікальний вміст копіюється один раз; дублікати стають жорсткими посиланнями
+    на першу копію (mode="hardlink") або лише записуються у звіт (mode="report").
+    """
+
+    def __init__(self, destination_root: Path, mode: str = "hardlink", copier: FileCopier = None):
+        self.destination_root = destination_root
+        self.mode = mode
+        self.copier = copier
+        self.duplicates = 0
+        self.saved_bytes = 0
+        self._by_size = {}
+        # Який унікальний вміст лежить за кожним шляхом призначення
+        self._by_destination = {}
+        self._lock = threading.Lock()
+        self._report = None
+        if mode == "report":
+            self._report = open(destination_root / DEDUPE_REPORT_NAME, "w", encoding="utf-8")
+
+    def _claim(self, file_path: Path, size: int):
+        """
+        Шукає вже відомий вміст, такий самий, як у файлі.
+        Якщо такого немає, реєструє файл як новий унікальний вміст.
+
+        :return: Пара (знайдений _Blob або None, новий _Blob або None).
+        """
+        with self._lock:
+            group = self._by_size.setdefault(size, (threading.Lock(), []))
+        group_lock, blobs = group
+        with group_lock:
+            if not blobs:
+                blob = _Blob(file_path)
+                blobs.append(blob)
+                return None, blob
+            digest = file_digest(file_path)
+            for blob in blobs:
+                if blob.digest is None:
+                    blob.ready.wait()
+                    try:
+                        blob.digest = file_digest(blob.source)
+                    except FileNotFoundError:
+                        # У режимі move джерело оригіналу зникає - хешуємо вже розміщену копію
+                        blob.digest = file_digest(blob.destination) if blob.destination is not None else ""
+                if blob.digest == digest:
+                    return blob, None
+            blob = _Blob(file_path, digest)
+            blobs.append(blob)
+            return None, blob
+
+    def place(self, file_path: Path, size: int, target: Path = None):
+        """
+        Розміщує файл у директорії призначення з урахуванням дублікатів.
+
+        :param file_path: Path об'єкт вихідного файлу.
+        :param size: Розмір файлу в байтах.
+        :param target: Шлях призначення, вже визначений індексом імен (None - destination_for).
+        :return: Шлях до файлу в директорії призначення, REPORTED для дубліката в режимі report
+            або None при помилці.
+        """
+        try:
+            original, blob = self._claim(file_path, size)
+        except OSError as e:
+            logger.error("Помилка при копіюванні файлу '%s': %s", file_path, e,
+                         extra={"event": "error", "source": file_path})
+            return None
+
+        if blob is not None:
+            try:
+                blob.destination = copy_file(file_path, self.destination_root, self.copier, target)
+                self._written(blob.destination, blob)
+            finally:
+                blob.ready.set()
+            return blob.destination
+
+        # Чекаємо, поки інший потік завершить копіювання оригіналу
+        original.ready.wait()
+        if self.mode == "report":
+            self._record(file_path, size, original.destination or original.source)
+            logger.debug("Дублікат: %s == %s", file_path, original.destination or original.source,
+                         extra={"event": "duplicate", "source": file_path, "destination": original.destination})
+            # Дублікат ніде не розміщується: маніфест не повинен вказувати на файл оригіналу
+            return REPORTED
+
+        if original.destination is None:
+            # Копію оригіналу не створено або її перезаписано - цей файл стає новою копією вмісту
+            copied = copy_file(file_path, self.destination_root, self.copier, target)
+            if copied is not None:
+                original.destination = copied
+                self._written(copied, original)
+            return copied
+
+        if target is None:
+            target = destination_for(file_path, self.destination_root)
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            replace_with_link(os.link, original.destination, target)
+        except OSError as e:
+            # Файлова система не підтримує жорсткі посилання - звичайне копіювання
+            logger.warning("Не вдалося створити посилання для '%s': %s", file_path, e,
+                           extra={"event": "link_failed", "source": file_path})
+            return copy_file(file_path, self.destination_root, self.copier, target)
+        if self.copier is not None and self.copier.mode == "move":
+            # Дублікат уже представлений посиланням - джерело більше не потрібне
+            file_path.unlink()
+        self._written(target, None)
+        self._record(file_path, size, original.destination)
+        logger.debug("Дублікат: %s -> %s (посилання на %s)", file_path, target, original.destination,
+                     extra={"event": "duplicate", "source": file_path, "destination": target})
+        return target
+
+    def _written(self, target: Path, blob: _Blob):
+        """
+        Запам'ятовує, що за шляхом target тепер лежить вміст blob.
+
+        Якщо там була копія іншого вмісту (політика overwrite), її більше не можна
+        використовувати як оригінал для посилань.
+        """
+        if target is None:
+            return
+        with self._lock:
+            previous = self._by_destination.pop(target, None)
+            if previous is not None and previous is not blob:
+                previous.destination = None
+            if blob is not None:
+                self._by_destination[target] = blob
+
+    def _record(self, file_path: Path, size: int, original: Path):
+        with self._lock:
+            self.duplicates += 1
+            self.saved_bytes += size
+            if self._report is not None:
+                self._report.write(json.dumps({
+                    "source": os.fspath(file_path),
+                    "size": size,
+                    "original": os.fspath(original),
+                }, ensure_ascii=False) + "\n")
+
+    def close(self):
+        """
+        Закриває звіт і виводить підсумок за дублікатами.
+        """
+        if self._report is not None:
+            self._report.close()
+        logger.info("Знайдено дублікатів: %d, заощаджено %d байт.", self.duplicates, self.saved_bytes,
+                    extra={"event": "dedupe", "files": self.duplicates, "size": self.saved_bytes})
+
+class NameIndex:
+    """
+    Індекс імен, уже розміщених у кожній піддиректорії розширення.
+
+    Конфлікти імен визначаються за словником у пам'яті, без перевірки Path.exists()
+    для кожного файлу. Імена порівнюються без урахування регістру, щоб результат був
+    однаковим і на нечутливих до регістру файлових системах (macOS, Windows). Для
+    кожного імені зберігається написання першого файлу, тож overwrite і newest
+    замінюють саме його, а не створюють поруч файл з іншим регістром.
+
+    Політики:
+    - suffix: report.pdf, report_1.pdf, report_2.pdf, ...
+    - hash: report-<перші 8 символів SHA-256>.pdf
+    - newest: лишається файл з новішим часом зміни
+    - skip: наступні файли з тим самим іменем пропускаються
+    - overwrite: попередня поведінка, останній файл перезаписує попередній
+    """
+
+    def __init__(self, policy: str = "suffix"):
+        self.policy = policy
+        self._buckets = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def seed(self, target: Path, mtime_ns: int = 0):
+        """
+        Позначає ім'я як зайняте (наприклад, файлом з попереднього запуску за маніфестом).
+
+        :param target: Path об'єкт файлу в директорії призначення.
+        :param mtime_ns: Час зміни вихідного файлу.
+        """
+        with self._lock:
+            self._buckets.setdefault(target.parent, {})[target.name.casefold()] = (mtime_ns, target.name)
+
+    def place(self, file_path: Path, target: Path, mtime_ns: int = 0, digest: str = None):
+        """
+        Резервує ім'я для файлу відповідно до політики.
+
+        :param file_path: Path об'єкт вихідного файлу.
+        :param target: Бажаний шлях у директорії призначення.
+        :param mtime_ns: Час зміни вихідного файлу (потрібен для політики newest).
+        :param digest: Уже відомий SHA-256 вмісту (для політики hash; None - обчислити з file_path).
+        :return: Path об'єкт, куди розміщувати файл, або None, якщо файл потрібно пропустити.
+        """
+        key = target.name.casefold()
+        with self._lock:
+            names = self._buckets.setdefault(target.parent, {})
+            if key not in names:
+                names[key] = (mtime_ns, target.name)
+                return target
+            placed_mtime_ns, placed_name = names[key]
+            if self.policy == "overwrite":
+                names[key] = (mtime_ns, placed_name)
+                return target.with_name(placed_name)
+            if self.policy == "skip":
+                return None
+            if self.policy == "newest":
+                if mtime_ns <= placed_mtime_ns:
+                    return None
+                names[key] = (mtime_ns, placed_name)
+                return target.with_name(placed_name)
+            if self.policy == "suffix":
+                # Лічильник пам'ятає останній номер, тому пошук вільного імені амортизовано O(1)
+                counter = self._counters.get((target.parent, key), 1)
+                candidate = target.with_name(f"{target.stem}_{counter}{target.suffix}")
+                while candidate.name.casefold() in names:
+                    counter += 1
+                    candidate = target.with_name(f"{target.stem}_{counter}{target.suffix}")
+                self._counters[(target.parent, key)] = counter + 1
+                names[candidate.name.casefold()] = (mtime_ns, candidate.name)
+                return candidate
+
+        # Хеш рахується поза блокуванням, щоб не зупиняти інші потоки
+        if digest is None:
+            digest = file_digest(file_path)
+        candidate = target.with_name(f"{target.stem}-{digest[:8]}{target.suffix}")
+        with self._lock:
+            names[candidate.name.casefold()] = (mtime_ns, candidate.name)
+        return candidate
+
+def is_archive(name: str) -> bool:
+    """
+    Перевіряє за іменем, чи є файл архівом, який підтримує режим --archives.
+
+    :param name: Ім'я файлу.
+    """
+    return name.lower().endswith(ARCHIVE_SUFFIXES)
+
+def iter_archive_members(archive_path: str):
+    """
+    Послідовно відкриває звичайні файли архіву як потоки, не розпаковуючи їх на диск.
+
+    Tar-архіви читаються в потоковому режимі ("r|*"), тому навіть стиснені архіви на
+    кілька гігабайт проходяться один раз без перемотування і без буферизації в пам'яті.
+
+    :param archive_path: Шлях до архіву.
+    :return: Генератор трійок (ім'я члена, mtime_ns, файловий об'єкт для читання).
+    """
+    if archive_path.lower().endswith('.zip'):
+        with zipfile.ZipFile(archive_path) as archive:
+            for info in archive.infolist():
+                if info.is_dir():
+                    continue
+                mtime_ns = int(time.mktime(info.date_time + (0, 0, -1)) * 1_000_000_000)
+                with archive.open(info) as member:
+                    yield info.filename, mtime_ns, member
+    else:
+        with tarfile.open(archive_path, "r|*") as archive:
+            for info in archive:
+                if not info.isfile():
+                    continue
+                member = archive.extractfile(info)
+                yield info.name, int(info.mtime * 1_000_000_000), member
+
+def member_ignored(rules: IgnoreRules, name: str, dir_cache: dict):
+    """
+    Застосовує правила ігнорування до шляху всередині архіву, включно з усіма його директоріями.
+
+    :param rules: Правила ігнорування.
+    :param name: Шлях члена архіву з '/' як роздільником.
+    :param dir_cache: Кеш результатів для директорій цього архіву.
+    :return: Текст правила, через яке член ігнорується, або None.
+    """
+    parts = [part for part in name.split('/') if part not in ('', '.')]
+    for depth in range(1, len(parts)):
+        directory = '/'.join(parts[:depth])
+        if directory not in dir_cache:
+            dir_cache[directory] = rules.match(directory, is_dir=True)
+        if dir_cache[directory] is not None:
+            return dir_cache[directory]
+    return rules.match('/'.join(parts))
+
+class SortSession:
+    """
+    Стан одного запуску сортування: корінь призначення та додаткові механізми
+    (маніфест інкрементального режиму, дедуплікація, стратегія копіювання,
+    індекс імен, розкладання архівів), спільні для всіх потоків копіювання.
+    """
+
+    def __init__(self, destination_root: Path, manifest: Manifest = None, dedupe: Deduplicator = None,
+                 copier: FileCopier = None, names: NameIndex = None, archive_rules: IgnoreRules = None):
+        self.destination_root = destination_root
+        self.manifest = manifest
+        self.dedupe = dedupe
+        self.copier = copier
+        self.names = names if names is not None else NameIndex()
+        # Правила для членів архівів; None - архіви копіюються як звичайні файли
+        self.archive_rules = archive_rules
+        if manifest is not None:
+            for destination, mtime_ns in manifest.destinations():
+                self.names.seed(destination, mtime_ns)
+        # Лічильники для звіту про прогрес
+        self.discovered = 0
+        self.processed = 0
+        self._lock = threading.Lock()
+
+    def process(self, entry: os.DirEntry):
+        """
+        Обробляє один файл, знайдений під час обходу.
+
+        :param entry: os.DirEntry об'єкт вихідного файлу.
+        """
+        reserved = self.reserve(entry)
+        if reserved is not None:
+            self.transfer(entry, *reserved)
+
+    def reserve(self, entry: os.DirEntry):
+        """
+        Визначає ціль файлу (маніфест, індекс імен); архіви розкладаються одразу.
+
+        Викликається в потоці обходу в порядку walk_source, тому імена в директорії
+        призначення не залежать від того, в якому порядку потоки завершують копіювання.
+
+        :param entry: os.DirEntry об'єкт вихідного файлу.
+        :return: Пара (шлях призначення, stat або None) для transfer або None, якщо файл уже оброблено.
+        """
+        reserved = None
+        try:
+            if self.archive_rules is not None and is_archive(entry.name) and self.extract_archive(entry):
+                return None
+            reserved = self.prepare(entry)
+            return reserved
+        finally:
+            if reserved is None:
+                self.mark_processed()
+
+    def transfer(self, entry: os.DirEntry, target: Path, stat: os.stat_result):
+        """
+        Переносить дані файлу до вже зарезервованої цілі; може виконуватися в пулі потоків.
+
+        :param entry: os.DirEntry об'єкт вихідного файлу.
+        :param target: Шлях призначення, повернутий reserve.
+        :param stat: Результат stat файлу або None.
+        """
+        try:
+            file_path = Path(entry.path)
+            if self.dedupe is not None:
+                target = self.dedupe.place(file_path, stat.st_size, target)
+                if target is REPORTED:
+                    self.complete(entry, stat, None)
+                    return
+            else:
+                target = copy_file(file_path, self.destination_root, self.copier, target)
+            if target is not None:
+                self.complete(entry, stat, target)
+        finally:
+            self.mark_processed()
+
+    def prepare(self, entry: os.DirEntry):
+        """
+        Визначає, чи потрібно копіювати файл і куди саме (маніфест, індекс імен).
+
+        :param entry: os.DirEntry об'єкт вихідного файлу.
+        :return: Пара (шлях призначення, stat або None) або None, якщо файл пропускається.
+        """
+        file_path = Path(entry.path)
+        stat = None
+        if self.manifest is not None or self.dedupe is not None or self.names.policy == "newest":
+            try:
+                stat = entry.stat()
+            except OSError as e:
+                logger.error("Помилка при копіюванні файлу '%s': %s", entry.path, e,
+                             extra={"event": "error", "source": entry.path})
+                return None
+
+        target = None
+        if self.manifest is not None:
+            if self.manifest.is_unchanged(entry.path, stat):
+                logger.debug("Пропущено: %s (не змінився з попереднього запуску)", entry.path,
+                             extra={"event": "unchanged", "source": entry.path})
+                return None
+            # Змінений файл замінює свою попередню копію, а не отримує нове ім'я
+            target = self.manifest.destination_of(entry.path)
+        if target is None:
+            try:
+                target = self.names.place(file_path, destination_for(file_path, self.destination_root),
+                                          stat.st_mtime_ns if stat is not None else 0)
+            except OSError as e:
+                logger.error("Помилка при копіюванні файлу '%s': %s", entry.path, e,
+                             extra={"event": "error", "source": entry.path})
+                return None
+            if target is None:
+                logger.debug("Пропущено: %s (файл з таким ім'ям уже є в директорії призначення)", entry.path,
+                             extra={"event": "collision_skipped", "source": entry.path})
+                return None
+        return target, stat
+
+    def extract_archive(self, entry: os.DirEntry) -> bool:
+        """
+        Розкладає члени архіву за розширеннями, читаючи їх напряму з архіву.
+
+        Кожен член копіюється блоками у тимчасовий файл у своїй піддиректорії, а потім
+        отримує остаточне ім'я через індекс імен, тож пам'ять не залежить від розміру архіву.
+        Незмінений архів у інкрементальному режимі пропускається цілком, а кожен член
+        записується в маніфест під ключем "архів:член", щоб наступні запуски знали його ім'я.
+
+        :param entry: os.DirEntry об'єкт архіву.
+        :return: False, якщо файл не вдалося відкрити як архів (тоді він копіюється як звичайний файл).
+            Архів, пошкоджений після перших членів, не копіюється і не записується в маніфест,
+            щоб наступний запуск спробував розкласти його знову.
+        """
+        try:
+            stat = entry.stat()
+        except OSError as e:
+            logger.error("Помилка при обробці '%s': %s", entry.path, e, extra={"event": "error", "source": entry.path})
+            return True
+        if self.manifest is not None and self.manifest.is_unchanged(entry.path, stat):
+            logger.debug("Пропущено: %s (не змінився з попереднього запуску)", entry.path,
+                         extra={"event": "unchanged", "source": entry.path})
+            return True
+
+        dir_cache = {}
+        members = iter_archive_members(entry.path)
+        started = False
+        try:
+            for name, mtime_ns, member in members:
+                started = True
+                rule = member_ignored(self.archive_rules, name, dir_cache)
+                if rule is not None:
+                    logger.debug("Ігноровано: %s:%s (правило '%s')", entry.path, name, rule,
+                                 extra={"event": "ignored", "source": f"{entry.path}:{name}", "rule": rule})
+                    continue
+                self._place_member(entry.path, name, mtime_ns, member)
+        except (zipfile.BadZipFile, tarfile.ReadError) as e:
+            if started:
+                # Частину членів уже розкладено - копія цілого архіву їх лише продублювала б
+                logger.error("Архів '%s' пошкоджено після перших членів: %s", entry.path, e,
+                             extra={"event": "error", "source": entry.path})
+                return True
+            logger.warning("Не вдалося прочитати '%s' як архів (%s), копіюється як звичайний файл.", entry.path, e,
+                           extra={"event": "archive_failed", "source": entry.path})
+            return False
+        except (OSError, tarfile.TarError, zipfile.error, EOFError) as e:
+            logger.error("Помилка при обробці архіву '%s': %s", entry.path, e,
+                         extra={"event": "error", "source": entry.path})
+            return True
+        finally:
+            members.close()
+
+        if self.manifest is not None:
+            # Сам архів нікуди не копіюється - у маніфесті лише позначка, що його розкладено
+            self.manifest.record(entry.path, stat, None)
+        return True
+
+    def _place_member(self, archive_path: str, name: str, mtime_ns: int, member):
+        source = f"{archive_path}:{name}"
+        member_name = Path(name.rstrip('/').rsplit('/', 1)[-1])
+        target = destination_for(member_name, self.destination_root)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp_target = target.with_name(f".{target.name}.{threading.get_ident()}.part")
+        digest = hashlib.sha256() if self.names.policy == "hash" else None
+        size = 0
+        try:
+            with open(tmp_target, "wb") as out:
+                for chunk in iter(lambda: member.read(HASH_CHUNK_SIZE), b""):
+                    out.write(chunk)
+                    size += len(chunk)
+                    if digest is not None:
+                        digest.update(chunk)
+            os.utime(tmp_target, ns=(mtime_ns, mtime_ns))
+            # Член зміненого архіву замінює свою попередню копію, як і звичайний файл
+            final = self.manifest.destination_of(source) if self.manifest is not None else None
+            if final is None:
+                final = self.names.place(None, target, mtime_ns, digest.hexdigest() if digest is not None else None)
+            if final is None:
+                os.unlink(tmp_target)
+                logger.debug("Пропущено: %s (файл з таким ім'ям уже є в директорії призначення)", source,
+                             extra={"event": "collision_skipped", "source": source})
+                return
+            os.replace(tmp_target, final)
+        except BaseException:
+            if tmp_target.exists():
+                tmp_target.unlink()
+            raise
+        if self.manifest is not None:
+            self.manifest.record_entry(source, size, mtime_ns, final)
+        if self.copier is not None:
+            self.copier.record("archive", size)
+        logger.debug("Розпаковано: %s -> %s", source, final,
+                     extra={"event": "extracted", "source": source, "destination": final})
+
+    def complete(self, entry: os.DirEntry, stat: os.stat_result, target: Path):
+        """
+        Фіксує успішно розміщений файл (запис у маніфест інкрементального режиму).
+
+        :param entry: os.DirEntry об'єкт вихідного файлу.
+        :param stat: Результат stat вихідного файлу (None, якщо маніфест не ведеться).
+        :param target: Шлях файлу в директорії призначення (None - дублікат лише записано у звіт).
+        """
+        if self.manifest is not None:
+            self.manifest.record(entry.path, stat, target)
+
+    def mark_processed(self):
+        """
+        Збільшує лічильник оброблених файлів для звіту про прогрес.
+        """
+        with self._lock:
+            self.processed += 1
+
+class BoundedExecutor:
+    """
+    Пул потоків з обмеженою чергою завдань.
+
+    submit() блокується, коли в роботі вже max_pending завдань, тому обхід
+    директорій не випереджає копіювання і пам'ять не росте разом з деревом.
+    """
+
+    def __init__(self, workers: int, max_pending: int = None):
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+        self.max_pending = max_pending or workers * 4
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+
+    def submit(self, fn, *args):
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, future):
+        self._slots.release()
+        # Результат завдань ніхто не чекає, тож виняток інакше зник би разом з future
+        if not future.cancelled() and future.exception() is not None:
+            exc = future.exception()
+            logger.error("Неочікувана помилка в потоці копіювання: %r", exc,
+                         exc_info=(type(exc), exc, exc.__traceback__), extra={"event": "error"})
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.shutdown()
+
+class JsonLinesFormatter(logging.Formatter):
+    """
+    Форматує кожен запис журналу як окремий рядок JSON для подальшої машинної обробки.
+    """
+
+    FIELDS = ("event", "source", "destination", "rule", "strategy", "files", "size")
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "time": record.created,
+            "level": record.levelname,
+            "message": record.getMessage(),
+        }
+        for field in self.FIELDS:
+            if hasattr(record, field):
+                data[field] = getattr(record, field)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+class ErrorCollector(logging.Handler):
+    """
+    Збирає помилки запуску для підсумкового звіту замість виводу в загальний потік.
+    """
+
+    def __init__(self):
+        super().__init__(logging.ERROR)
+        self.errors = []
+
+    def emit(self, record: logging.LogRecord):
+        self.errors.append(record.getMessage())
+
+class RunLog:
+    """
+    Журнал одного запуску сортування.
+
+    Записи передаються через чергу (QueueHandler/QueueListener) і записуються окремим
+    потоком, тож потоки копіювання не чекають на вивід. Консоль отримує повідомлення
+    від заданого рівня, крім помилок - ті збираються і виводяться підсумком у close().
+    За потреби всі події дублюються у файл JSON lines.
+    """
+
+    def __init__(self, level: str = "INFO", json_path: str = None):
+        self.collector = ErrorCollector()
+        console = logging.StreamHandler(sys.stdout)
+        console.setLevel(level)
+        console.addFilter(lambda record: record.levelno < logging.ERROR)
+        handlers = [console, self.collector]
+        if json_path:
+            json_handler = logging.FileHandler(json_path, "w", encoding="utf-8")
+            json_handler.setFormatter(JsonLinesFormatter())
+            handlers.append(json_handler)
+
+        self._handlers = handlers
+        self._queue_handler = logging.handlers.QueueHandler(queue.SimpleQueue())
+        self._listener = logging.handlers.QueueListener(self._queue_handler.queue, *handlers,
+                                                        respect_handler_level=True)
+        logger.addHandler(self._queue_handler)
+        logger.setLevel(logging.DEBUG if json_path else level)
+        logger.propagate = False
+        self._listener.start()
+
+    def close(self):
+        """
+        Дописує всі записи з черги та виводить звіт про помилки.
+        """
+        logger.removeHandler(self._queue_handler)
+        self._listener.stop()
+        for handler in self._handlers:
+            handler.close()
+        errors = self.collector.errors
+        if errors:
+            print(f"Помилок під час запуску: {len(errors)}")
+            for message in errors:
+                print(f"  {message}")
+
+class ProgressReporter:
+    """
+    Періодично пише в журнал підсумок прогресу: файли/с, МБ/с та орієнтовний час до кінця.
+
+    ETA рахується за кількістю вже знайдених файлів, тому стає точним після завершення обходу.
+    """
+
+    def __init__(self, session: SortSession, interval: float = 2.0):
+        self.session = session
+        self.interval = interval
+        self.walk_done = False
+        self._started = time.monotonic()
+        self._stop = threading.Event()
+        self._thread = None
+        if interval > 0:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._report("Прогрес")
+
+    def _report(self, title: str):
+        elapsed = max(time.monotonic() - self._started, 1e-9)
+        processed, discovered = self.session.processed, self.session.discovered
+        copied_bytes = self.session.copier.totals()[1] if self.session.copier is not None else 0
+        files_rate = processed / elapsed
+        if self.walk_done and files_rate > 0:
+            eta = f"{(discovered - processed) / files_rate:.0f} с"
+        else:
+            eta = "невідомо (обхід триває)"
+        logger.info("%s: %d з %d файлів за %.1f с, %.1f файлів/с, %.2f МБ/с, залишилось %s",
+                    title, processed, discovered, elapsed, files_rate, copied_bytes / elapsed / 2**20, eta,
+                    extra={"event": "progress", "files": processed, "size": copied_bytes})
+
+    def close(self):
+        """
+        Зупиняє періодичні повідомлення та пише фінальний підсумок.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.walk_done = True
+        self._report("Готово")
+
+def scan_directory(current: str, prefix: str, rules: IgnoreRules):
+    """
+    Переглядає одну директорію через os.scandir і застосовує правила ігнорування.
+
+    :param current: Шлях до директорії.
+    :param prefix: Шлях директорії від кореня обходу з '/' у кінці ('' для кореня).
+    :param rules: Правила ігнорування.
+    :return: Генератор пар ("file", os.DirEntry) або ("dir", (шлях, шлях від кореня з '/')).
+    """
+    try:
+        with os.scandir(current) as entries:
+            for entry in entries:
+                rel_path = prefix + entry.name
+                if entry.is_dir():
+                    rule = rules.match(rel_path, is_dir=True)
+                    if rule is not None:
+                        logger.debug("Ігноровано директорію: %s (правило '%s')", entry.path, rule,
+                                     extra={"event": "ignored", "source": entry.path, "rule": rule})
+                        continue
+                    yield "dir", (entry.path, rel_path + '/')
+                elif entry.is_file():
+                    rule = rules.match(rel_path)
+                    if rule is not None:
+                        logger.debug("Ігноровано: %s (правило '%s')", entry.path, rule,
+                                     extra={"event": "ignored", "source": entry.path, "rule": rule})
+                        continue
+                    yield "file", entry
+                else:
+                    logger.debug("Ігноровано: %s (не файл і не директорія)", entry.path,
+                                 extra={"event": "ignored", "source": entry.path})
+    except PermissionError as pe:
+        logger.error("Недостатньо прав доступу до '%s': %s", current, pe,
+                     extra={"event": "error", "source": current})
+    except OSError as e:
+        logger.error("Помилка при обробці '%s': %s", current, e,
+                     extra={"event": "error", "source": current})
+
+def walk_source(source_dir: Path, rules: IgnoreRules = None):
+    """
+    Ітеративно обходить дерево директорій через os.scandir і повертає файли по одному.
+
+    Тип запису береться з кешованої інформації os.DirEntry, тому зайвих викликів stat
+    немає, а замість рекурсії використовується стек, тож глибина дерева не обмежена.
+    Проігноровані директорії відкидаються до того, як обхід у них заходить.
+
+    Порядок відрізняється від колишнього рекурсивного обходу через iterdir: спершу
+    повертаються всі файли директорії (у порядку os.scandir), а вже потім по черзі
+    обходяться її піддиректорії. Від цього порядку залежить нумерація суфіксів імен.
+
+    :param source_dir: Path об'єкт вихідної директорії.
+    :param rules: Правила ігнорування (None - DEFAULT_IGNORE_RULES).
+    :return: Генератор os.DirEntry об'єктів файлів, які потрібно скопіювати.
+    """
+    if rules is None:
+        rules = DEFAULT_IGNORE_RULES
+    stack = [(os.fspath(source_dir), '')]
+    while stack:
+        current, prefix = stack.pop()
+        subdirs = []
+        for kind, item in scan_directory(current, prefix, rules):
+            if kind == "dir":
+                subdirs.append(item)
+            else:
+                yield item
+        # Піддиректорії обходяться вглиб у порядку os.scandir, але лише після всіх файлів поточної
+        stack.extend(reversed(subdirs))
+
+def recursive_copy(source_dir: Path, destination_root: Path, executor: BoundedExecutor = None,
+                   session: SortSession = None, rules: IgnoreRules = None):
+    """
+    Перебирає все дерево директорії, копіює файли до директорії призначення,
     сортує їх у піддиректорії за розширенням файлів, ігноруючи системні файли.
 
     :param source_dir: Path об'єкт вихідної директорії.
     :param destination_root: Path об'єкт кореневої директорії призначення.
+    :param executor: Пул потоків для паралельного копіювання (None - копіювати послідовно).
+    :param session: Стан запуску сортування (None - звичайне копіювання без додаткових режимів).
+    :param rules: Правила ігнорування (None - DEFAULT_IGNORE_RULES).
+    """
+    if session is None:
+        session = SortSession(destination_root)
+    # Незавершені копіювання за ціллю: політики overwrite/newest віддають одну ціль кільком файлам
+    in_flight = {}
+    for entry in walk_source(source_dir, rules):
+        session.discovered += 1
+        # Копіюємо файл (у пулі потоків, якщо він заданий)
+        if executor is None:
+            session.process(entry)
+            continue
+        # Ціль резервується тут, у порядку обходу, а в пул іде лише копіювання даних
+        reserved = session.reserve(entry)
+        if reserved is None:
+            continue
+        target = reserved[0]
+        previous = in_flight.get(target)
+        if previous is not None:
+            # Файли з однією ціллю записуються в порядку обходу, як і без потоків
+            wait([previous])
+        in_flight[target] = executor.submit(session.transfer, entry, *reserved)
+        if len(in_flight) > executor.max_pending * 2:
+            in_flight = {path: future for path, future in in_flight.items() if not future.done()}
+
+async def async_copy(source_dir: Path, session: SortSession, rules: IgnoreRules = None,
+                     limits: tuple = ASYNC_LIMITS, queue_size: int = 256):
+    """
+    Асинхронний конвеєр копіювання з трьох стадій, з'єднаних обмеженими чергами.
+
+    Перегляд директорій, читання та запис виконуються окремими групами задач, кожна зі
+    своїм обмеженням кількості одночасних операцій, тому для джерел з великою затримкою
+    (мережеві диски, FUSE) одночасно можуть виконуватися сотні запитів. Блокуючі виклики
+    йдуть у пул потоків відповідного розміру. Дані передаються блоками ASYNC_CHUNK_SIZE
+    через чергу кожного файлу, тому пам'ять обмежена незалежно від розміру файлів.
+
+    Піддиректорії переглядаються наперед і паралельно, але цілі файлів резервує одна задача
+    в порядку walk_source, тому результат - те саме дерево, що й у синхронному режимі
+    (лише режим copy).
+
+    :param source_dir: Path об'єкт вихідної директорії.
+    :param session: Стан запуску сортування.
+    :param rules: Правила ігнорування (None - DEFAULT_IGNORE_RULES).
+    :param limits: Кількість задач для стадій (перегляд, читання, запис).
+    :param queue_size: Розмір черг між стадіями.
+    :raises ValueError: Якщо сесія використовує дедуплікацію, архіви або режим, відмінний від copy.
     """
+    if (session.dedupe is not None or session.archive_rules is not None
+            or (session.copier is not None and session.copier.mode != "copy")):
+        raise ValueError("Асинхронний режим підтримує лише копіювання без дедуплікації та архівів.")
+    if rules is None:
+        rules = DEFAULT_IGNORE_RULES
+    listers, readers, writers = limits
+    loop = asyncio.get_running_loop()
+    pool = ThreadPoolExecutor(max_workers=listers + readers + writers)
+
+    def blocking(fn, *args):
+        return loop.run_in_executor(pool, fn, *args)
+
+    listing_slots = asyncio.Semaphore(listers)
+    file_queue = asyncio.Queue(maxsize=queue_size)
+    write_queue = asyncio.Queue(maxsize=queue_size)
+
+    async def list_directory(path: str, prefix: str):
+        async with listing_slots:
+            return await blocking(lambda: list(scan_directory(path, prefix, rules)))
+
+    async def walker():
+        # Незавершені записи за ціллю: політики overwrite/newest віддають одну ціль кільком файлам
+        in_flight = {}
+        stack = [asyncio.ensure_future(list_directory(os.fspath(source_dir), ''))]
+        try:
+            while stack:
+                found = await stack.pop()
+                subdirs = []
+                for kind, value in found:
+                    if kind == "dir":
+                        # Перегляд піддиректорії починається одразу, поки резервуються файли поточної
+                        subdirs.append(asyncio.ensure_future(list_directory(*value)))
+                        continue
+                    session.discovered += 1
+                    prepared = await blocking(session.prepare, value)
+                    if prepared is None:
+                        session.mark_processed()
+                        continue
+                    target, stat = prepared
+                    previous = in_flight.get(target)
+                    if previous is not None:
+                        # Файли з однією ціллю записуються в порядку обходу, як і без конвеєра
+                        await previous
+                    written = loop.create_future()
+                    in_flight[target] = written
+                    await file_queue.put((value, stat, target, written))
+                    if len(in_flight) > queue_size * 4:
+                        in_flight = {path: future for path, future in in_flight.items() if not future.done()}
+                # Той самий порядок, що й у walk_source: файли директорії, потім її піддиректорії вглиб
+                stack.extend(reversed(subdirs))
+        finally:
+            for listing in stack:
+                listing.cancel()
+
+    async def reader():
+        while True:
+            job = await file_queue.get()
+            if job is None:
+                return
+            entry = job[0]
+            chunks = asyncio.Queue(maxsize=4)
+            await write_queue.put((*job, chunks))
+            try:
+                f = await blocking(open, entry.path, "rb")
+                try:
+                    while True:
+                        chunk = await blocking(f.read, ASYNC_CHUNK_SIZE)
+                        await chunks.put(chunk)
+                        if not chunk:
+                            break
+                finally:
+                    await blocking(f.close)
+            except OSError as e:
+                # Помилку читання передаємо записувачу, щоб він не чекав на дані вічно
+                await chunks.put(e)
+
+    async def writer():
+        while True:
+            job = await write_queue.get()
+            if job is None:
+                return
+            entry, stat, target, written, chunks = job
+            tmp_target = target.with_name(f".{target.name}.{id(job)}.tmp")
+            size = 0
+            finished = False
+            try:
+                await blocking(lambda: target.parent.mkdir(parents=True, exist_ok=True))
+                # Як і FileCopier, пишемо у тимчасовий файл і замінюємо ціль атомарно
+                f = await blocking(open, tmp_target, "wb")
+                try:
+                    while True:
+                        chunk = await chunks.get()
+                        if isinstance(chunk, Exception):
+                            finished = True
+                            raise chunk
+                        if not chunk:
+                            finished = True
+                            break
+                        await blocking(f.write, chunk)
+                        size += len(chunk)
+                finally:
+                    await blocking(f.close)
+                await blocking(shutil.copystat, entry.path, tmp_target)
+                await blocking(os.replace, tmp_target, target)
+                session.complete(entry, stat, target)
+                if session.copier is not None:
+                    session.copier.record("buffered", size)
+                logger.debug("Скопійовано: %s -> %s", entry.path, target,
+                             extra={"event": "copied", "source": entry.path, "destination": target})
+            except Exception as e:
+                logger.error("Помилка при копіюванні файлу '%s': %s", entry.path, e,
+                             extra={"event": "error", "source": entry.path})
+                if os.path.lexists(tmp_target):
+                    os.unlink(tmp_target)
+                # Дочитуємо решту блоків, щоб читач цього файлу не завис на повній черзі
+                while not finished:
+                    chunk = await chunks.get()
+                    finished = isinstance(chunk, Exception) or not chunk
+            finally:
+                written.set_result(None)
+                session.mark_processed()
+
     try:
-        for item in source_dir.iterdir():
-            if is_ignored(item):
-                print(f"Ігноровано: {item} (системний або схований файл/директорія)")
-                continue
+        reading = [asyncio.create_task(reader()) for _ in range(readers)]
+        writing = [asyncio.create_task(writer()) for _ in range(writers)]
+        await walker()
+        for _ in range(readers):
+            await file_queue.put(None)
+        await asyncio.gather(*reading)
+        for _ in range(writers):
+            await write_queue.put(None)
+        await asyncio.gather(*writing)
+    finally:
+        pool.shutdown(wait=True)
 
-            if item.is_dir():
-                if item.name in IGNORE_DIRS:
-                    print(f"Ігноровано директорію: {item} (системна директорія)")
-                    continue
-                # Рекурсивно обробляємо піддиректорію
-                recursive_copy(item, destination_root)
-            elif item.is_file():
-                # Копіюємо файл
-                copy_file(item, destination_root)
-            else:
-                print(f"Ігноровано: {item} (не файл і не директорія)")
-    except PermissionError as pe:
-        print(f"Недостатньо прав доступу до '{source_dir}': {pe}")
-    except Exception as e:
-        print(f"Помилка при обробці '{source_dir}': {e}")
+def load_ignore_rules(ignore_files: list = None) -> IgnoreRules:
+    """
+    Повертає правила ігнорування за замовчуванням, доповнені правилами з файлів.
 
-def copy_and_sort_files(source: str, destination: str):
+    :param ignore_files: Файли з додатковими правилами у форматі .gitignore.
+    :return: Об'єкт IgnoreRules.
+    """
+    if not ignore_files:
+        return DEFAULT_IGNORE_RULES
+    rules = IgnoreRules()
+    for ignore_file in ignore_files:
+        rules.load(ignore_file)
+    return rules
+
+def plan_sort(source_dir: Path, rules: IgnoreRules = None) -> dict:
+    """
+    Обходить джерело без запису і рахує, що саме буде скопійовано.
+
+    :param source_dir: Path об'єкт вихідної директорії.
+    :param rules: Правила ігнорування (None - DEFAULT_IGNORE_RULES).
+    :return: Словник {розширення: [кількість файлів, загальний розмір, очікувані конфлікти імен]}.
+    """
+    plan = {}
+    seen_names = {}
+    for entry in walk_source(source_dir, rules):
+        bucket = bucket_for(Path(entry.name))
+        stats = plan.setdefault(bucket, [0, 0, 0])
+        names = seen_names.setdefault(bucket, set())
+        try:
+            size = entry.stat().st_size
+        except OSError as e:
+            logger.error("Помилка при обробці '%s': %s", entry.path, e,
+                         extra={"event": "error", "source": entry.path})
+            continue
+        key = entry.name.casefold()
+        stats[0] += 1
+        stats[1] += size
+        if key in names:
+            stats[2] += 1
+        else:
+            names.add(key)
+    return plan
+
+def print_plan(plan: dict):
+    """
+    Виводить план сортування таблицею, від найбільших піддиректорій до найменших.
+
+    :param plan: Результат plan_sort.
+    """
+    print(f"{'Розширення':<20} {'Файлів':>10} {'Байт':>16} {'Конфліктів':>11}")
+    for bucket, (files, total, collisions) in sorted(plan.items(), key=lambda item: -item[1][1]):
+        print(f"{bucket:<20} {files:>10} {total:>16} {collisions:>11}")
+    files = sum(stats[0] for stats in plan.values())
+    total = sum(stats[1] for stats in plan.values())
+    collisions = sum(stats[2] for stats in plan.values())
+    print(f"{'Разом':<20} {files:>10} {total:>16} {collisions:>11}")
+
+def copy_and_sort_files(source: str, destination: str, workers: int = 1, incremental: bool = False,
+                        dedupe: str = None, copy_strategy: str = "auto", mode: str = "copy",
+                        on_collision: str = "suffix", ignore_files: list = None, log_level: str = "INFO",
+                        log_json: str = None, progress_interval: float = 2.0, use_async: bool = False,
+                        async_limits: tuple = ASYNC_LIMITS, archives: bool = False):
     """
     Початкова функція для копіювання та сортування файлів.
 
     :param source: Шлях до вихідної директорії.
     :param destination: Шлях до директорії призначення.
+    :param workers: Кількість потоків копіювання.
+    :param incremental: Пропускати файли, які не змінилися з попереднього запуску.
+    :param dedupe: Режим дедуплікації ("hardlink" або "report"), None - без дедуплікації.
+    :param copy_strategy: Стратегія копіювання даних ("auto" або одна з COPY_STRATEGIES).
+    :param mode: Спосіб розміщення файлів (один з TRANSFER_MODES).
+    :param on_collision: Політика для однакових імен (одна з COLLISION_POLICIES).
+    :param ignore_files: Файли з додатковими правилами ігнорування у форматі .gitignore.
+    :param log_level: Рівень повідомлень у консолі.
+    :param log_json: Файл для журналу у форматі JSON lines (None - не записувати).
+    :param progress_interval: Інтервал повідомлень про прогрес у секундах (0 - лише підсумок).
+    :param use_async: Використовувати асинхронний конвеєр замість потоків (лише mode="copy" без dedupe).
+    :param async_limits: Кількість одночасних операцій для стадій асинхронного режиму.
+    :param archives: Розкладати члени zip/tar архівів за розширеннями замість копіювання самих архівів.
+    :raises ValueError: Якщо use_async поєднано з dedupe, archives, mode, відмінним від copy,
+        або стратегією копіювання, відмінною від auto.
     """
+    if use_async and (dedupe or archives or mode != "copy" or copy_strategy != "auto"):
+        raise ValueError("Асинхронний режим підтримує лише mode='copy' і copy_strategy='auto' "
+                         "без dedupe та archives.")
     source_path = Path(source).resolve()
     destination_path = Path(destination).resolve()
 
@@ -137,8 +1671,37 @@ def copy_and_sort_files(source: str, destination: str):
         print(f"Не вдалося створити директорію призначення '{destination_path}': {e}")
         sys.exit(1)
 
+    try:
+        rules = load_ignore_rules(ignore_files)
+    except OSError as e:
+        print(f"Не вдалося прочитати файл правил ігнорування: {e}")
+        sys.exit(1)
+
+    run_log = RunLog(log_level, log_json)
+    manifest = Manifest(destination_path / MANIFEST_NAME) if incremental else None
+    copier = FileCopier(copy_strategy, mode)
+    deduplicator = Deduplicator(destination_path, dedupe, copier) if dedupe else None
+    session = SortSession(destination_path, manifest, deduplicator, copier, NameIndex(on_collision),
+                          rules if archives else None)
+    progress = ProgressReporter(session, progress_interval)
+
     # Починаємо рекурсивне копіювання
-    recursive_copy(source_path, destination_path)
+    try:
+        if use_async:
+            asyncio.run(async_copy(source_path, session, rules, tuple(async_limits)))
+        elif workers > 1:
+            with BoundedExecutor(workers) as executor:
+                recursive_copy(source_path, destination_path, executor, session, rules)
+        else:
+            recursive_copy(source_path, destination_path, session=session, rules=rules)
+    finally:
+        progress.close()
+        if manifest is not None:
+            manifest.close()
+        if deduplicator is not None:
+            deduplicator.close()
+        copier.report()
+        run_log.close()
 
 def test_copy():
     """
@@ -162,16 +1725,28 @@ def test_copy():
     print("Тестове копіювання завершено.")
 
 def main():
-    source, destination, is_test = parse_arguments()
-    if is_test:
+    args = parse_arguments()
+    source, destination = args.source, args.destination
+    if args.test:
         test_copy()
     else:
         if not source:
             print("Не вказано вихідну директорію. Використовуйте --help для отримання інформації.")
             sys.exit(1)
+        if args.plan:
+            try:
+                rules = load_ignore_rules(args.ignore_file)
+            except OSError as e:
+                print(f"Не вдалося прочитати файл правил ігнорування: {e}")
+                sys.exit(1)
+            print_plan(plan_sort(Path(source).resolve(), rules))
+            return
         if not destination:
             destination = "dist"  # За замовчуванням 'dist' якщо не вказано
-        copy_and_sort_files(source, destination)
+        copy_and_sort_files(source, destination, args.workers, args.incremental, args.dedupe,
+                            args.copy_strategy, args.mode, args.on_collision,
+                            args.ignore_file, args.log_level, args.log_json, args.progress_interval,
+                            args.use_async, args.async_limits, args.archives)
 
 if __name__ == "__main__":
     main()
@@ -1,4 +1,31 @@
-import turtle
+import os
+import sys
+import zlib
+import math
+import struct
+import argparse
+from array import array
+from collections import OrderedDict
+
+from profiling import add_measure_arguments, run_measured
+
+# sin(60°) для побудови вершини "зубця" кривої Коха
+SIN60 = 3 ** 0.5 / 2
+
+# Одиничні вектори для напрямків, кратних 60° (індекс - номер напрямку проти годинникової стрілки)
+DIRECTIONS = ((1.0, 0.0), (0.5, SIN60), (-0.5, SIN60), (-1.0, 0.0), (-0.5, -SIN60), (0.5, -SIN60))
+
+# Поворот (у кроках по 60°) перед кожною з чотирьох частин кривої: forward, left 60, right 120, left 60
+KOCH_TURNS = (0, 1, -1, 0)
+
+# Формати, які підтримує експорт без графічного інтерфейсу
+EXPORT_FORMATS = ('svg', 'png')
+
+# Обмеження пам'яті для кешу одиничних кривих Коха (байти)
+KOCH_CACHE_BYTES = 64 * 1024 * 1024
+
+# Найбільша довжина рядка, який L-система розгортає та інтерпретує цілим блоком
+LSYSTEM_BLOCK_SYMBOLS = 4096
 
 def koch_curve(t, order, size):
     """
@@ -19,6 +46,655 @@ def koch_curve(t, order, size):
         t.left(60)
         koch_curve(t, order-1, size/3)
 
+def subdivide(points):
+    """
+    Один крок побудови кривої Коха: кожен відрізок ламаної замінюється чотирма.
+
+    :param points: array('d') з координатами x0, y0, x1, y1, ... вершин ламаної.
+    :return: Новий array('d') з учетверо більшою кількістю відрізків.
+    """
+    result = array('d', points[:2])
+    x0, y0 = points[0], points[1]
+    for i in range(2, len(points), 2):
+        x1, y1 = points[i], points[i + 1]
+        dx = (x1 - x0) / 3
+        dy = (y1 - y0) / 3
+        ax = x0 + dx
+        ay = y0 + dy
+        # Вершина зубця - поворот третини відрізка на 60° проти годинникової стрілки (t.left(60))
+        result.extend((ax, ay,
+                       ax + dx * 0.5 - dy * SIN60, ay + dx * SIN60 + dy * 0.5,
+                       ax + dx, ay + dy,
+                       x1, y1))
+        x0, y0 = x1, y1
+    return result
+
+def transform_curve(points, size=1.0, x=0.0, y=0.0, heading=0.0):
+    """
+    Переносить одиничну криву (від (0, 0) до (1, 0)) у потрібне місце одним афінним перетворенням.
+
+    Параметри повторюють стан turtle: крива починається в (x, y), має довжину size
+    і напрямок heading у градусах (проти годинникової стрілки, як t.left).
+
+    :param points: array('d') з координатами одиничної кривої.
+    :param size: Довжина кривої.
+    :param x, y: Початкова точка кривої.
+    :param heading: Напрямок кривої в градусах.
+    :return: Новий array('d') з перетвореними координатами.
+    """
+    angle = math.radians(heading)
+    c = size * math.cos(angle)
+    s = size * math.sin(angle)
+    # Зрізи з кроком копіюються на рівні C, у Python лишається один прохід на кожну вісь
+    us = points[0::2]
+    vs = points[1::2]
+    result = array('d', bytes(len(points) * points.itemsize))
+    result[0::2] = array('d', [x + c * u - s * v for u, v in zip(us, vs)])
+    result[1::2] = array('d', [y + s * u + c * v for u, v in zip(us, vs)])
+    return result
+
+class KochCurveCache:
+    """
+    LRU-кеш одиничних кривих Коха за порядком з обмеженням за пам'яттю.
+
+    Криву довільного розміру, положення і повороту отримано афінним перетворенням
+    закешованої одиничної кривої, а криву вищого порядку - досплітанням найближчого
+    закешованого нижчого порядку, а не побудовою з нуля.
+    """
+
+    def __init__(self, max_bytes=KOCH_CACHE_BYTES):
+        """
+        :param max_bytes: Найбільший сумарний розмір масивів у кеші; 0 - нічого не зберігати.
+        """
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._curves = OrderedDict()
+
+    def __len__(self):
+        return len(self._curves)
+
+    def __contains__(self, order):
+        return order in self._curves
+
+    def clear(self):
+        self._curves.clear()
+        self.nbytes = 0
+
+    def _lookup(self, order):
+        points = self._curves.get(order)
+        if points is None:
+            self.misses += 1
+        else:
+            self._curves.move_to_end(order)
+            self.hits += 1
+        return points
+
+    def _store(self, order, points):
+        size = len(points) * points.itemsize
+        if size > self.max_bytes:
+            return
+        self._curves[order] = points
+        self.nbytes += size
+        while self.nbytes > self.max_bytes:
+            _, evicted = self._curves.popitem(last=False)
+            self.nbytes -= len(evicted) * evicted.itemsize
+
+    def unit(self, order):
+        """
+        Повертає одиничну криву Коха від (0, 0) до (1, 0).
+
+        Результат спільний для всіх викликів - його не можна змінювати на місці.
+
+        :param order: Порядок кривої.
+        :return: array('d') з координатами 4**order + 1 вершин.
+        """
+        points = self._lookup(order)
+        if points is not None:
+            return points
+
+        # Продовжуємо з найвищого закешованого порядку, меншого за потрібний
+        start = next((lower for lower in range(order - 1, -1, -1) if lower in self._curves), None)
+        if start is None:
+            start, points = 0, array('d', (0.0, 0.0, 1.0, 0.0))
+            self._store(0, points)
+        else:
+            points = self._curves[start]
+            self._curves.move_to_end(start)
+        for level in range(start + 1, order + 1):
+            points = subdivide(points)
+            self._store(level, points)
+        return points
+
+    def curve(self, order, size=1.0, x=0.0, y=0.0, heading=0.0):
+        """
+        Повертає криву Коха заданого порядку, довжини, положення та напрямку.
+
+        :return: array('d') з координатами x0, y0, x1, y1, ...
+        """
+        return transform_curve(self.unit(order), size, x, y, heading)
+
+    def snowflake(self, order, size=300):
+        """
+        Збирає сніжинку Коха з трьох перетворених копій однієї одиничної кривої.
+
+        :return: array('d') так само, як у koch_snowflake_points.
+        """
+        unit = self.unit(order)
+        top = size / (2 * 3**0.5)
+        # Сторони обходяться за годинниковою стрілкою, як у draw_koch_snowflake (t.right(120))
+        points = transform_curve(unit, size, -size / 2, top, 0)
+        points.extend(transform_curve(unit, size, size / 2, top, -120)[2:])
+        points.extend(transform_curve(unit, size, 0.0, top - size * SIN60, 120)[2:])
+        return points
+
+# Спільний кеш для koch_snowflake_points
+koch_cache = KochCurveCache()
+
+def koch_snowflake_points(order, size=300, cache=None):
+    """
+    Ітеративно обчислює вершини сніжинки Коха без turtle і без рекурсії.
+
+    Вершини йдуть у тому самому порядку, у якому їх проходить draw_koch_snowflake,
+    а ламана замкнена (остання вершина збігається з першою). Одиничні криві беруться
+    з кешу, тому повторні виклики для інших розмірів або вищих порядків не
+    перераховують уже побудовані рівні.
+
+    :param order: Порядок сніжинки.
+    :param size: Довжина сторони трикутника-сніжинки.
+    :param cache: KochCurveCache; None - спільний кеш модуля.
+    :return: array('d') з координатами x0, y0, x1, y1, ... (3 * 4**order + 1 вершин).
+    """
+    if cache is None:
+        cache = koch_cache
+    return cache.snowflake(order, size)
+
+def _outside(viewport, x0, y0, x1, y1):
+    """
+    Перевіряє, чи крива Коха над відрізком гарантовано не потрапляє у видиму область.
+
+    Уся крива над відрізком довжини L лежить у колі радіуса L/2 з центром у середині
+    відрізка (вершина зубця віддалена від середини лише на L·√3/6), тому досить
+    порівняти відстань від центру кола до прямокутника з радіусом.
+    """
+    xmin, ymin, xmax, ymax = viewport
+    mx = (x0 + x1) / 2
+    my = (y0 + y1) / 2
+    nx = min(max(mx, xmin), xmax) - mx
+    ny = min(max(my, ymin), ymax) - my
+    return nx * nx + ny * ny > ((x1 - x0) ** 2 + (y1 - y0) ** 2) / 4
+
+def iter_koch_curve(order, x0, y0, x1, y1, viewport=None, min_segment=0.0):
+    """
+    Лениво повертає вершини кривої Коха від (x0, y0) до (x1, y1) у порядку малювання.
+
+    Відрізки зберігаються у стеку глибиною O(order), а не в масиві всієї кривої.
+    Частини кривої поза видимою областю або коротші за min_segment не діляться далі,
+    а замінюються прямим відрізком, тому наближені рендери дуже високих порядків
+    обходять лише видимі та помітні деталі. Ламана при цьому лишається неперервною.
+
+    :param order: Порядок кривої.
+    :param x0, y0: Початок кривої (сама ця вершина не повертається).
+    :param x1, y1: Кінець кривої.
+    :param viewport: Видима область (xmin, ymin, xmax, ymax) або None - без відсікання.
+    :param min_segment: Мінімальна довжина відрізка, який ще варто ділити (наприклад, розмір пікселя).
+    :return: Генератор пар (x, y).
+    """
+    min_squared = min_segment * min_segment
+    stack = [(x0, y0, x1, y1, order)]
+    while stack:
+        x0, y0, x1, y1, depth = stack.pop()
+        dx = (x1 - x0) / 3
+        dy = (y1 - y0) / 3
+        if (depth == 0 or 9 * (dx * dx + dy * dy) < min_squared
+                or (viewport is not None and _outside(viewport, x0, y0, x1, y1))):
+            yield x1, y1
+            continue
+        ax = x0 + dx
+        ay = y0 + dy
+        px = ax + dx * 0.5 - dy * SIN60
+        py = ay + dx * SIN60 + dy * 0.5
+        bx = ax + dx
+        by = ay + dy
+        # Частини додаються у зворотному порядку, щоб першою зі стеку вийшла перша частина
+        depth -= 1
+        stack.append((bx, by, x1, y1, depth))
+        stack.append((px, py, bx, by, depth))
+        stack.append((ax, ay, px, py, depth))
+        stack.append((x0, y0, ax, ay, depth))
+
+def iter_koch_snowflake_points(order, size=300, viewport=None, min_segment=0.0):
+    """
+    Лениво повертає вершини сніжинки Коха по одній, з пам'яттю O(order).
+
+    Без відсікання напрямок кожного відрізка визначається сумою поворотів за цифрами
+    його номера в четвірковій системі, тому ні рекурсія, ні масив вершин не потрібні.
+    З viewport або min_segment кожна сторона генерується через iter_koch_curve.
+    Порядок вершин такий самий, як у koch_snowflake_points.
+
+    :param order: Порядок сніжинки.
+    :param size: Довжина сторони трикутника-сніжинки.
+    :param viewport: Видима область (xmin, ymin, xmax, ymax) або None - без відсікання.
+    :param min_segment: Мінімальна довжина відрізка, який ще варто ділити.
+    :return: Генератор пар (x, y), 3 * 4**order + 1 вершин без відсікання.
+    """
+    if viewport is not None or min_segment > 0:
+        top = size / (2 * 3**0.5)
+        corners = ((-size / 2, top), (size / 2, top), (0.0, top - size * SIN60), (-size / 2, top))
+        yield corners[0]
+        for (x0, y0), (x1, y1) in zip(corners, corners[1:]):
+            yield from iter_koch_curve(order, x0, y0, x1, y1, viewport, min_segment)
+        return
+
+    step = size / 3**order
+    vectors = [(dx * step, dy * step) for dx, dy in DIRECTIONS]
+    x, y = -size / 2, size / (2 * 3**0.5)
+    yield x, y
+    for side in range(3):
+        # Кожна наступна сторона повернута на 120° за годинниковою стрілкою (t.right(120))
+        direction = -2 * side
+        digits = [0] * order
+        for _ in range(4**order):
+            dx, dy = vectors[direction % 6]
+            x += dx
+            y += dy
+            yield x, y
+            # Збільшуємо четверковий лічильник і одразу оновлюємо напрямок
+            for position in range(order - 1, -1, -1):
+                digit = digits[position]
+                direction -= KOCH_TURNS[digit]
+                if digit < 3:
+                    digits[position] = digit + 1
+                    direction += KOCH_TURNS[digit + 1]
+                    break
+                digits[position] = 0
+
+class LSystem:
+    """
+    L-система з інтерпретацією черепашкою: F (або інші символи з draw) - крок уперед,
+    + - поворот ліворуч на angle, - - праворуч, | - розворот. Решта символів лише
+    беруть участь у переписуванні.
+
+    Рядок порядку n не будується повністю: верхні рівні обходяться в глибину зі стеком
+    ітераторів, а нижні розгортаються блоками через str.translate. Кут має ділити 360°,
+    тому напрямок - це ціле число, і ламана кожного блоку для кожного початкового
+    напрямку обчислюється один раз, а далі лише зсувається у поточну точку.
+    """
+
+    def __init__(self, axiom, rules, angle, draw="F", heading=0.0):
+        """
+        :param axiom: Початковий рядок.
+        :param rules: Словник правил {символ: заміна}.
+        :param angle: Кут повороту в градусах.
+        :param draw: Символи, що означають крок уперед з малюванням.
+        :param heading: Початковий напрямок у градусах.
+        """
+        headings = 360 / angle
+        if headings != int(headings):
+            raise ValueError(f"Кут {angle}° має ділити 360° без остачі")
+        self.axiom = axiom
+        self.rules = dict(rules)
+        self.angle = angle
+        self.draw = frozenset(draw)
+        self.heading = heading
+        self.headings = int(headings)
+        self._table = str.maketrans(self.rules)
+        self._expansions = {}
+        self._blocks = {}
+
+    def expand(self, order):
+        """
+        Повністю розгортає рядок заданого порядку (лише для невеликих порядків).
+        """
+        word = self.axiom
+        for _ in range(order):
+            word = word.translate(self._table)
+        return word
+
+    def _block_depth(self, order):
+        """
+        Найбільша глибина, на яку кожен символ правил розгортається не довше за LSYSTEM_BLOCK_SYMBOLS.
+        """
+        depth = 0
+        words = list(self.rules.values())
+        while depth < order:
+            words = [word.translate(self._table) for word in words]
+            if max(map(len, words), default=0) > LSYSTEM_BLOCK_SYMBOLS:
+                break
+            depth += 1
+        return depth
+
+    def _expansion(self, symbol, depth):
+        key = (symbol, depth)
+        word = self._expansions.get(key)
+        if word is None:
+            word = symbol
+            for _ in range(depth):
+                word = word.translate(self._table)
+            self._expansions[key] = word
+        return word
+
+    def iter_symbols(self, order):
+        """
+        Лениво повертає рядок порядку order частинами, з пам'яттю O(order + LSYSTEM_BLOCK_SYMBOLS).
+
+        :param order: Кількість кроків переписування.
+        :return: Генератор рядків, конкатенація яких дорівнює expand(order).
+        """
+        depth = self._block_depth(order)
+        for symbol in self._iter_leaves(order - depth):
+            yield self._expansion(symbol, depth)
+
+    def _iter_leaves(self, top):
+        """
+        Обходить дерево переписування до глибини top і повертає символи на цій глибині.
+        """
+        stack = [iter(self.axiom)]
+        while stack:
+            for symbol in stack[-1]:
+                if len(stack) <= top and symbol in self.rules:
+                    stack.append(iter(self.rules[symbol]))
+                    break
+                yield symbol
+            else:
+                stack.pop()
+
+    def _block(self, symbol, depth, direction):
+        """
+        Ламана блоку (символ, розгорнутий на depth рівнів) відносно його початку.
+
+        :return: Кортеж (xs, ys, поворот) - координати вершин для кроку 1 і зміна напрямку.
+        """
+        key = (symbol, depth, direction)
+        block = self._blocks.get(key)
+        if block is None:
+            angle = math.radians(self.heading)
+            step = 2 * math.pi / self.headings
+            vectors = [(math.cos(angle + step * i), math.sin(angle + step * i)) for i in range(self.headings)]
+            half = self.headings // 2
+            xs, ys = [], []
+            x = y = 0.0
+            turn = direction
+            for char in self._expansion(symbol, depth):
+                if char in self.draw:
+                    dx, dy = vectors[turn % self.headings]
+                    x += dx
+                    y += dy
+                    xs.append(x)
+                    ys.append(y)
+                elif char == "+":
+                    turn += 1
+                elif char == "-":
+                    turn -= 1
+                elif char == "|":
+                    turn += half
+            block = self._blocks[key] = (xs, ys, (turn - direction) % self.headings)
+        return block
+
+    def _iter_runs(self, order):
+        """
+        Повертає вершини блоками: пари списків (xs, ys) для кроку 1 і початку в (0, 0).
+        """
+        depth = self._block_depth(order)
+        x = y = 0.0
+        direction = 0
+        for symbol in self._iter_leaves(order - depth):
+            xs, ys, turn = self._block(symbol, depth, direction)
+            direction = (direction + turn) % self.headings
+            if xs:
+                yield [x + dx for dx in xs], [y + dy for dy in ys]
+                x += xs[-1]
+                y += ys[-1]
+
+    def iter_points(self, order, step=1.0, x=0.0, y=0.0):
+        """
+        Лениво повертає вершини ламани порядку order.
+
+        :param order: Кількість кроків переписування.
+        :param step: Довжина одного кроку вперед.
+        :param x, y: Початкова точка.
+        :return: Генератор пар (x, y), починаючи з початкової точки.
+        """
+        yield x, y
+        for xs, ys in self._iter_runs(order):
+            for u, v in zip(xs, ys):
+                yield x + step * u, y + step * v
+
+    def points(self, order, step=1.0, x=0.0, y=0.0):
+        """
+        Обчислює всі вершини ламани порядку order.
+
+        :return: array('d') з координатами x0, y0, x1, y1, ...
+        """
+        xs = array('d', (0.0,))
+        ys = array('d', (0.0,))
+        for run_xs, run_ys in self._iter_runs(order):
+            xs.extend(run_xs)
+            ys.extend(run_ys)
+        result = array('d', bytes(2 * len(xs) * xs.itemsize))
+        result[0::2] = array('d', [x + step * u for u in xs])
+        result[1::2] = array('d', [y + step * v for v in ys])
+        return result
+
+# Готові L-системи. Сніжинка Коха збігається з koch_snowflake_points для кроку size / 3**order
+LSYSTEM_PRESETS = {
+    'koch-snowflake': LSystem("F--F--F", {"F": "F+F--F+F"}, 60),
+    'koch-curve': LSystem("F", {"F": "F+F--F+F"}, 60),
+    'quadratic-koch': LSystem("F", {"F": "F+F-F-F+F"}, 90),
+    'levy-c': LSystem("F", {"F": "+F--F+"}, 45),
+    'dragon': LSystem("FX", {"X": "X+YF+", "Y": "-FX-Y"}, 90),
+    'sierpinski-arrowhead': LSystem("A", {"A": "B-A-B", "B": "A+B+A"}, 60, draw="AB"),
+}
+
+def default_viewport(size, margin=10):
+    """
+    Видима область, у яку вміщується вся сніжинка.
+
+    Центр трикутника збігається з початком координат, тому всі вершини лежать у колі
+    радіуса size/√3.
+
+    :param size: Довжина сторони трикутника-сніжинки.
+    :param margin: Відступ від краю.
+    :return: Кортеж (xmin, ymin, xmax, ymax).
+    """
+    radius = size / 3**0.5 + margin
+    return -radius, -radius, radius, radius
+
+def write_svg(out, points, viewport, color="blue", stroke_width=1.0):
+    """
+    Записує ламану у форматі SVG, не збираючи весь документ у пам'яті.
+
+    :param out: Текстовий файловий об'єкт для запису.
+    :param points: Ітерабельний об'єкт пар (x, y) у координатах turtle (вісь y вгору).
+    :param viewport: Видима область (xmin, ymin, xmax, ymax).
+    :param color: Колір лінії.
+    :param stroke_width: Товщина лінії.
+    """
+    xmin, ymin, xmax, ymax = viewport
+    width = xmax - xmin
+    height = ymax - ymin
+    # У SVG вісь y спрямована вниз, тому верх області - це -ymax
+    out.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+    out.write(f'<svg xmlns="http://www.w3.org/2000/svg" width="{width:.0f}" height="{height:.0f}" '
+              f'viewBox="{xmin:.6g} {-ymax:.6g} {width:.6g} {height:.6g}">\n')
+    out.write(f'<rect x="{xmin:.6g}" y="{-ymax:.6g}" width="{width:.6g}" height="{height:.6g}" fill="white"/>\n')
+    out.write(f'<path fill="none" stroke="{color}" stroke-width="{stroke_width * width / 600:.6g}" '
+              f'vector-effect="non-scaling-stroke" d="')
+    command = "M"
+    for x, y in points:
+        out.write(f"{command}{x:.6g} {-y:.6g} ")
+        command = "L"
+    out.write('"/>\n</svg>\n')
+
+def _png_chunk(out, kind, data):
+    out.write(struct.pack(">I", len(data)))
+    out.write(kind + data)
+    out.write(struct.pack(">I", zlib.crc32(kind + data) & 0xffffffff))
+
+def write_png(out, points, viewport, pixels=1024):
+    """
+    Растеризує ламану у чорно-біле зображення PNG лише засобами стандартної бібліотеки.
+
+    Вершини надходять потоком, тому пам'ять обмежена розміром зображення, а не
+    кількістю вершин. Рядки стискаються і записуються частинами.
+
+    :param out: Бінарний файловий об'єкт для запису.
+    :param points: Ітерабельний об'єкт пар (x, y) у координатах turtle (вісь y вгору).
+    :param viewport: Видима область (xmin, ymin, xmax, ymax).
+    :param pixels: Ширина зображення; висота - за пропорціями області.
+    """
+    xmin, ymin, xmax, ymax = viewport
+    scale = (pixels - 1) / (xmax - xmin)
+    width = pixels
+    height = max(1, int(round((ymax - ymin) * scale)) + 1)
+    canvas = bytearray(b"\xff" * (width * height))
+
+    previous = None
+    for x, y in points:
+        current = ((x - xmin) * scale, (ymax - y) * scale)
+        if previous is not None:
+            _draw_segment(canvas, width, height, previous, current)
+        previous = current
+
+    out.write(b"\x89PNG\r\n\x1a\n")
+    _png_chunk(out, b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 0, 0, 0, 0))
+    compressor = zlib.compressobj(9)
+    for row in range(height):
+        # Байт 0 на початку рядка - фільтр "None"
+        data = compressor.compress(b"\x00" + canvas[row * width:(row + 1) * width])
+        if data:
+            _png_chunk(out, b"IDAT", data)
+    _png_chunk(out, b"IDAT", compressor.flush())
+    _png_chunk(out, b"IEND", b"")
+
+def _draw_segment(canvas, width, height, start, end):
+    """
+    Відсікає відрізок межами полотна (алгоритм Ліанга-Барскі) і малює видиму частину.
+    """
+    (x0, y0), (x1, y1) = start, end
+    dx = x1 - x0
+    dy = y1 - y0
+    t0, t1 = 0.0, 1.0
+    for p, q in ((-dx, x0), (dx, width - 1 - x0), (-dy, y0), (dy, height - 1 - y0)):
+        if p == 0:
+            if q < 0:
+                return
+            continue
+        t = q / p
+        if p < 0:
+            t0 = max(t0, t)
+        else:
+            t1 = min(t1, t)
+        if t0 > t1:
+            return
+    _draw_line(canvas, width,
+               int(round(x0 + t0 * dx)), int(round(y0 + t0 * dy)),
+               int(round(x0 + t1 * dx)), int(round(y0 + t1 * dy)))
+
+def _draw_line(canvas, width, x0, y0, x1, y1):
+    """
+    Малює відрізок на полотні алгоритмом Брезенхема.
+    """
+    dx = abs(x1 - x0)
+    dy = -abs(y1 - y0)
+    sx = 1 if x0 < x1 else -1
+    sy = 1 if y0 < y1 else -1
+    error = dx + dy
+    while True:
+        canvas[y0 * width + x0] = 0
+        if x0 == x1 and y0 == y1:
+            return
+        doubled = 2 * error
+        if doubled >= dy:
+            error += dy
+            x0 += sx
+        if doubled <= dx:
+            error += dx
+            y0 += sy
+
+def export_koch_snowflake(path, order, size=300, fmt=None, pixels=1024, color="blue",
+                          viewport=None, min_segment=None):
+    """
+    Зберігає сніжинку Коха у файл без графічного інтерфейсу.
+
+    Вершини генеруються потоком (iter_koch_snowflake_points) і одразу записуються у файл,
+    тому навіть для порядків з десятками мільйонів вершин документ не збирається в пам'яті.
+    Для PNG деталі менші за піксель і частини поза областю не генеруються взагалі.
+
+    :param path: Шлях до файлу.
+    :param order: Порядок сніжинки.
+    :param size: Довжина сторони трикутника-сніжинки.
+    :param fmt: Формат ("svg" або "png"); None - визначити за розширенням файлу.
+    :param pixels: Ширина растрового зображення в пікселях.
+    :param color: Колір лінії (лише для SVG).
+    :param viewport: Область (xmin, ymin, xmax, ymax) для наближення; None - вся сніжинка.
+    :param min_segment: Найкоротший відрізок, який ще ділиться; None - піксель для PNG, без обмеження для SVG.
+    """
+    fmt = _export_format(path, fmt)
+    cull = viewport is not None or fmt == "png"
+    if viewport is None:
+        viewport = default_viewport(size)
+    if min_segment is None:
+        min_segment = (viewport[2] - viewport[0]) / pixels if fmt == "png" else 0.0
+
+    points = iter_koch_snowflake_points(order, size, viewport if cull else None, min_segment)
+    _write_points(path, fmt, points, viewport, pixels, color)
+
+def _export_format(path, fmt):
+    if fmt is None:
+        fmt = os.path.splitext(path)[1][1:].lower()
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Непідтримуваний формат '{fmt}'. Доступні: {', '.join(EXPORT_FORMATS)}")
+    return fmt
+
+def _write_points(path, fmt, points, viewport, pixels, color):
+    if fmt == "svg":
+        with open(path, "w", encoding="utf-8", buffering=1024 * 1024) as out:
+            write_svg(out, points, viewport, color)
+    else:
+        with open(path, "wb") as out:
+            write_png(out, points, viewport, pixels)
+
+def fit_lsystem(system, order, size=300):
+    """
+    Підбирає крок і початкову точку, щоб фігура мала розмір size і центр у початку координат.
+
+    Межі знаходяться окремим потоковим проходом, тож масив вершин не зберігається.
+
+    :return: Кортеж (step, x, y) для LSystem.iter_points.
+    """
+    xmin = ymin = xmax = ymax = 0.0
+    for x, y in system.iter_points(order):
+        if x < xmin:
+            xmin = x
+        elif x > xmax:
+            xmax = x
+        if y < ymin:
+            ymin = y
+        elif y > ymax:
+            ymax = y
+    step = size / (max(xmax - xmin, ymax - ymin) or 1.0)
+    return step, -step * (xmin + xmax) / 2, -step * (ymin + ymax) / 2
+
+def export_lsystem(path, name, order, size=300, fmt=None, pixels=1024, color="blue"):
+    """
+    Зберігає фрактал з LSYSTEM_PRESETS у файл SVG або PNG потоком вершин.
+
+    :param path: Шлях до файлу.
+    :param name: Назва L-системи в LSYSTEM_PRESETS.
+    :param order: Кількість кроків переписування.
+    :param size: Розмір фігури (більша зі сторін обмежувального прямокутника).
+    :param fmt: Формат ("svg" або "png"); None - визначити за розширенням файлу.
+    :param pixels: Ширина растрового зображення в пікселях.
+    :param color: Колір лінії (лише для SVG).
+    """
+    fmt = _export_format(path, fmt)
+    system = LSYSTEM_PRESETS[name]
+    step, x, y = fit_lsystem(system, order, size)
+    half = size / 2 + 10
+    _write_points(path, fmt, system.iter_points(order, step, x, y), (-half, -half, half, half), pixels, color)
+
 def draw_koch_snowflake(order, size=300):
     """
     Малює сніжинку Коха, яка складається з трьох кривих Коха.
@@ -26,28 +702,104 @@ def draw_koch_snowflake(order, size=300):
     :param order: Рекурсивний порядок сніжинки.
     :param size: Довжина сторони трикутника-сніжинки.
     """
+    # Вершини обчислюються заздалегідь, а малюються одним проходом
+    draw_points(koch_snowflake_points(order, size), "Сніжинка Коха")
+
+def draw_lsystem(name, order, size=300):
+    """
+    Малює фрактал з LSYSTEM_PRESETS у вікні turtle.
+
+    :param name: Назва L-системи.
+    :param order: Кількість кроків переписування.
+    :param size: Розмір фігури.
+    """
+    system = LSYSTEM_PRESETS[name]
+    draw_points(system.points(order, *fit_lsystem(system, order, size)), name)
+
+def draw_points(points, title):
+    """
+    Малює замкнену чи відкриту ламану у вікні turtle.
+
+    :param points: array('d') з координатами x0, y0, x1, y1, ...
+    :param title: Заголовок вікна.
+    """
+    import turtle
+
     # Налаштування екрану
     window = turtle.Screen()
     window.bgcolor("white")
-    window.title("Сніжинка Коха")
+    window.title(title)
+    # Вимикаємо анімацію: екран оновиться один раз, коли вся ламана буде готова
+    window.tracer(0)
 
     # Налаштування черепашки
     t = turtle.Turtle()
     t.speed(0)  # Максимальна швидкість малювання
     t.color("blue")
+    t.hideturtle()
     t.penup()
-    # Розраховуємо початкову позицію для центрування сніжинки
-    t.goto(-size / 2, size / (2 * 3**0.5))
+    # Початкова позиція для центрування сніжинки - перша вершина
+    t.goto(points[0], points[1])
     t.pendown()
 
-    # Малюємо три криві Коха, утворюючи трикутник
-    for _ in range(3):
-        koch_curve(t, order, size)
-        t.right(120)  # Поворот на 120 градусів для наступної кривої
+    for i in range(2, len(points), 2):
+        t.goto(points[i], points[i + 1])
 
     # Завершуємо малювання
-    t.hideturtle()
+    window.update()
     window.mainloop()
 
-# Виклик функції для малювання сніжинки Коха з порядком 3
-draw_koch_snowflake(3)
+def parse_arguments():
+    """
+    Парсинг аргументів командного рядка.
+    """
+    parser = argparse.ArgumentParser(description="Малює сніжинку Коха або зберігає її у файл SVG/PNG.")
+    parser.add_argument("--order", type=int, default=3, help="Порядок сніжинки.")
+    parser.add_argument("--preset", choices=sorted(LSYSTEM_PRESETS), default=None,
+                        help="Інший фрактал як L-система (за замовчуванням - сніжинка Коха).")
+    parser.add_argument("--size", type=float, default=300, help="Довжина сторони трикутника-сніжинки.")
+    parser.add_argument("--output", default=None,
+                        help="Файл для збереження (.svg або .png); без нього сніжинка малюється у вікні turtle.")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default=None,
+                        help="Формат файлу (за замовчуванням - за розширенням).")
+    parser.add_argument("--pixels", type=int, default=1024, help="Розмір растрового зображення в пікселях.")
+    parser.add_argument("--color", default="blue", help="Колір лінії для SVG.")
+    parser.add_argument("--viewport", type=float, nargs=4, default=None, metavar=("XMIN", "YMIN", "XMAX", "YMAX"),
+                        help="Область для наближення в координатах turtle; частини поза нею не генеруються.")
+    parser.add_argument("--min-segment", type=float, default=None,
+                        help="Найкоротший відрізок, який ще ділиться (за замовчуванням - піксель для PNG).")
+    parser.add_argument("--quiet", action="store_true", help="Не виводити повідомлення про збереження файлу.")
+    add_measure_arguments(parser)
+    args = parser.parse_args()
+    if args.order < 0:
+        parser.error("--order має бути невід'ємним.")
+    return args
+
+def run(args):
+    """
+    Виконує дію, задану аргументами командного рядка: експорт у файл або малювання у вікні.
+    """
+    if args.output:
+        try:
+            if args.preset:
+                export_lsystem(args.output, args.preset, args.order, args.size, args.format, args.pixels, args.color)
+            else:
+                export_koch_snowflake(args.output, args.order, args.size, args.format, args.pixels, args.color,
+                                      args.viewport, args.min_segment)
+        except (ValueError, OSError) as e:
+            print(f"Не вдалося зберегти сніжинку: {e}")
+            sys.exit(1)
+        if not args.quiet:
+            print(f"{args.preset or 'Сніжинку Коха'} порядку {args.order} збережено у '{args.output}'.")
+    elif args.preset:
+        draw_lsystem(args.preset, args.order, args.size)
+    else:
+        draw_koch_snowflake(args.order, args.size)
+
+def main():
+    args = parse_arguments()
+    run_measured(run, args, timed=args.time, profile=args.profile)
+
+if __name__ == "__main__":
+    # Виклик функції для малювання сніжинки Коха з порядком 3 (або з параметрами командного рядка)
+    main()
@@ -1,23 +1,164 @@
-def move_disk(from_peg, to_peg, pegs):
+import sys
+import argparse
+
+from profiling import add_measure_arguments, run_measured
+
+# Назви веж у порядку їхніх номерів у двійковому кодуванні ходів
+PEGS = ('A', 'B', 'C')
+
+# Заповнювач непарної кількості ходів в останньому байті кодування
+PAD_NIBBLE = 0xF
+
+# Скільки рядків виводу ходів накопичується перед одним записом у потік
+OUTPUT_BUFFER_LINES = 8192
+
+# Розмір блоку двійкового кодування ходів, який віддається для запису за раз
+ENCODE_CHUNK_SIZE = 1 << 16
+
+def move_disk(from_peg, to_peg, pegs, out=None):
     """
     Переміщує диск з однієї вежі на іншу.
 
     :param from_peg: Вежа, з якої переміщується диск
     :param to_peg: Вежа, на яку переміщується диск
     :param pegs: Словник веж
+    :param out: Текстовий потік для опису ходу; None - хід не виводиться
     """
     if not pegs[from_peg]:
-        print(f"Вежа {from_peg} пуста. Неможливо перемістити диск.")
+        print(f"Вежа {from_peg} пуста. Неможливо перемістити диск.", file=out or sys.stdout)
         return
-    disk = pegs[from_peg].pop()
+    disk = pegs[from_peg][-1]
     if pegs[to_peg] and pegs[to_peg][-1] < disk:
-        print(f"Неможливо помістити диск {disk} на менший диск {pegs[to_peg][-1]}.")
-        pegs[from_peg].append(disk)  # Відміна переміщення
+        print(f"Неможливо помістити диск {disk} на менший диск {pegs[to_peg][-1]}.", file=out or sys.stdout)
     else:
-        pegs[to_peg].append(disk)
-        print(f"Перемістіть диск {disk} з вежі {from_peg} на вежу {to_peg}.")
+        pegs[to_peg].append(pegs[from_peg].pop())
+        if out is not None:
+            print(f"Перемістіть диск {disk} з вежі {from_peg} на вежу {to_peg}.", file=out)
+
+class PegState:
+    """
+    Компактний стан веж: по одній бітовій масці на вежу (біт d - диск d).
+
+    Верхній диск вежі - наймолодший встановлений біт її маски, тому перевірка ходу і сам
+    хід - кілька операцій над цілими без списків.
+    """
+
+    def __init__(self, n, pegs=PEGS, source='A'):
+        """
+        :param n: Кількість дисків
+        :param pegs: Назви веж
+        :param source: Вежа, на якій спочатку лежать усі диски
+        """
+        self.n = n
+        self.pegs = tuple(pegs)
+        self.index = {peg: i for i, peg in enumerate(self.pegs)}
+        self.masks = [0] * len(self.pegs)
+        self.masks[self.index[source]] = (1 << (n + 1)) - 2
+        self.moves = 0
+
+    def top(self, peg):
+        """
+        Повертає верхній диск вежі або 0, якщо вежа порожня.
+        """
+        mask = self.masks[self.index[peg]]
+        return (mask & -mask).bit_length() - 1 if mask else 0
+
+    def can_move(self, from_peg, to_peg):
+        """
+        Перевіряє, чи можна перемістити верхній диск з from_peg на to_peg.
+        """
+        source = self.masks[self.index[from_peg]]
+        target = self.masks[self.index[to_peg]]
+        return source != 0 and (target == 0 or (target & -target) > (source & -source))
+
+    def move(self, from_peg, to_peg):
+        """
+        Переміщує верхній диск.
+
+        :return: Номер переміщеного диска
+        :raises ValueError: Якщо вежа порожня або диск кладеться на менший
+        """
+        if not self.can_move(from_peg, to_peg):
+            raise ValueError(f"Хід {self.moves + 1}: неможливо перемістити диск з вежі {from_peg} на вежу {to_peg}")
+        i = self.index[from_peg]
+        j = self.index[to_peg]
+        bit = self.masks[i] & -self.masks[i]
+        self.masks[i] ^= bit
+        self.masks[j] |= bit
+        self.moves += 1
+        return bit.bit_length() - 1
+
+    def apply_all(self, moves):
+        """
+        Перевіряє і виконує потік ходів (диск, з вежі, на вежу) в одному циклі на локальних змінних.
+
+        :param moves: Ітерабельний об'єкт трійок (диск, з вежі, на вежу)
+        :return: Кількість виконаних ходів
+        :raises ValueError: На першому неприпустимому ході; стан лишається перед ним
+        """
+        index = self.index
+        masks = self.masks
+        done = self.moves
+        try:
+            for disk, from_peg, to_peg in moves:
+                i = index[from_peg]
+                j = index[to_peg]
+                source = masks[i]
+                bit = source & -source
+                target = masks[j]
+                if bit != 1 << disk or (target and (target & -target) < bit):
+                    raise ValueError(f"Хід {done + 1}: неможливо перемістити диск {disk} "
+                                     f"з вежі {from_peg} на вежу {to_peg}")
+                masks[i] = source ^ bit
+                masks[j] = target | bit
+                done += 1
+        finally:
+            self.moves = done
+        return done
+
+    def as_dict(self):
+        """
+        Повертає стан у форматі словника веж, диски знизу вгору.
+        """
+        return {peg: [disk for disk in range(self.n, 0, -1) if mask >> disk & 1]
+                for peg, mask in zip(self.pegs, self.masks)}
+
+def validate_moves(n, moves, source='A', pegs=PEGS):
+    """
+    Перевіряє, що весь потік ходів допустимий, починаючи з усіх дисків на source.
+
+    :param n: Кількість дисків
+    :param moves: Ітерабельний об'єкт трійок (диск, з вежі, на вежу), наприклад decode_moves(data)
+    :param source: Початкова вежа
+    :param pegs: Назви веж
+    :return: PegState після всіх ходів
+    :raises ValueError: На першому неприпустимому ході
+    """
+    state = PegState(n, pegs, source)
+    state.apply_all(moves)
+    return state
+
+def echo_moves(moves, out=None, lines=OUTPUT_BUFFER_LINES):
+    """
+    Передає ходи далі без змін і водночас виводить їх, записуючи в потік пачками рядків.
 
-def hanoi_recursive(n, source, target, auxiliary, pegs):
+    :param moves: Ітерабельний об'єкт трійок (диск, з вежі, на вежу)
+    :param out: Текстовий потік; None - sys.stdout
+    :param lines: Кількість рядків в одному записі
+    :return: Генератор тих самих ходів
+    """
+    out = out or sys.stdout
+    buffer = []
+    for move in moves:
+        disk, from_peg, to_peg = move
+        buffer.append(f"Перемістіть диск {disk} з вежі {from_peg} на вежу {to_peg}.\n")
+        if len(buffer) >= lines:
+            out.write("".join(buffer))
+            buffer.clear()
+        yield move
+    out.write("".join(buffer))
+
+def hanoi_recursive(n, source, target, auxiliary, pegs, move=move_disk):
     """
     Рекурсивно вирішує задачу Ханойських веж.
 
@@ -26,31 +167,306 @@ def hanoi_recursive(n, source, target, auxiliary, pegs):
     :param target: Вежа, на яку переміщають диски
     :param auxiliary: Допоміжна вежа
     :param pegs: Словник веж
+    :param move: Функція переміщення диска (за замовчуванням move_disk без виводу;
+        для виводу ходів - functools.partial(move_disk, out=sys.stdout))
     """
     if n == 0:
         return
-    hanoi_recursive(n-1, source, auxiliary, target, pegs)
-    move_disk(source, target, pegs)
-    hanoi_recursive(n-1, auxiliary, target, source, pegs)
+    hanoi_recursive(n-1, source, auxiliary, target, pegs, move)
+    move(source, target, pegs)
+    hanoi_recursive(n-1, auxiliary, target, source, pegs, move)
+
+def hanoi_move_at(n, k, source='A', target='C', auxiliary='B'):
+    """
+    Повертає k-й хід оптимального розв'язку без відтворення попередніх ходів.
+
+    Працює з цілими довільної довжини, тому n може бути сотнями дисків.
+
+    :param n: Кількість дисків
+    :param k: Номер ходу, від 1 до 2**n - 1
+    :return: Трійка (диск, з вежі, на вежу)
+    """
+    if not 1 <= k < 2**n:
+        raise ValueError(f"Номер ходу має бути від 1 до 2**{n} - 1, отримано {k}")
+    order = (source, auxiliary, target) if n % 2 else (source, target, auxiliary)
+    return (k & -k).bit_length(), order[(k & (k - 1)) % 3], order[((k | (k - 1)) + 1) % 3]
+
+def hanoi_state_at(n, k, source='A', target='C', auxiliary='B'):
+    """
+    Повертає розташування дисків після k ходів оптимального розв'язку за O(n).
+
+    Найбільший диск d лежить на source, доки не виконано 2**(d - 1) ходів, і на target
+    після цього, тому біт d - 1 числа k визначає його вежу і те, як далі переставляються
+    ролі веж для меншої вежі з d - 1 дисків.
+
+    :param n: Кількість дисків
+    :param k: Кількість виконаних ходів, від 0 до 2**n - 1
+    :return: Словник веж, диски на кожній - знизу вгору
+    """
+    if not 0 <= k < 2**n:
+        raise ValueError(f"Кількість ходів має бути від 0 до 2**{n} - 1, отримано {k}")
+    pegs = {source: [], target: [], auxiliary: []}
+    bits = format(k, f"0{n}b") if n else ""
+    for disk, bit in zip(range(n, 0, -1), bits):
+        if bit == "0":
+            pegs[source].append(disk)
+            target, auxiliary = auxiliary, target
+        else:
+            pegs[target].append(disk)
+            source, auxiliary = auxiliary, source
+    return pegs
+
+def verify_random_access(n):
+    """
+    Звіряє hanoi_move_at і hanoi_state_at з рекурсивною симуляцією hanoi_recursive.
+
+    :param n: Кількість дисків (невелика - перевіряється кожен хід)
+    :return: Кількість перевірених ходів
+    """
+    pegs = {'A': list(range(n, 0, -1)), 'B': [], 'C': []}
+    checked = 0
+
+    def move(from_peg, to_peg, pegs):
+        nonlocal checked
+        checked += 1
+        disk = pegs[from_peg].pop()
+        pegs[to_peg].append(disk)
+        if hanoi_move_at(n, checked) != (disk, from_peg, to_peg):
+            raise ValueError(f"Хід {checked} для {n} дисків не збігається з симуляцією")
+        if hanoi_state_at(n, checked) != pegs:
+            raise ValueError(f"Стан після {checked} ходів для {n} дисків не збігається з симуляцією")
 
-def hanoi_tower_func(n):
+    if hanoi_state_at(n, 0) != pegs:
+        raise ValueError(f"Початковий стан для {n} дисків не збігається з симуляцією")
+    hanoi_recursive(n, 'A', 'C', 'B', pegs, move)
+    return checked
+
+def iter_hanoi_moves(n, source='A', target='C', auxiliary='B'):
+    """
+    Ітеративно генерує оптимальну послідовність ходів без рекурсії і без стеку.
+
+    Хід номер m (від 1) переміщує диск, номер якого дорівнює кількості молодших нульових
+    бітів m плюс один, з вежі (m & (m - 1)) % 3 на вежу ((m | (m - 1)) + 1) % 3. Для
+    непарного n ці номери означають (source, auxiliary, target), для парного -
+    (source, target, auxiliary). Пам'ять - лише лічильник m.
+
+    :param n: Кількість дисків
+    :param source: Вежа, з якої переміщають диски
+    :param target: Вежа, на яку переміщають диски
+    :param auxiliary: Допоміжна вежа
+    :return: Генератор трійок (диск, з вежі, на вежу), 2**n - 1 ходів
+    """
+    order = (source, auxiliary, target) if n % 2 else (source, target, auxiliary)
+    for m in range(1, 2**n):
+        yield (m & -m).bit_length(), order[(m & (m - 1)) % 3], order[((m | (m - 1)) + 1) % 3]
+
+def encode_moves(moves, chunk_size=ENCODE_CHUNK_SIZE):
+    """
+    Пакує ходи у байти: пара (з вежі, на вежу) - це 4 біти, по два ходи в байті.
+
+    Номер диска не зберігається - в оптимальній послідовності він відновлюється з номера ходу.
+    Байти віддаються блоками, тож пам'ять не залежить від кількості ходів (2^n - 1).
+
+    :param moves: Ітерабельний об'єкт трійок (диск, з вежі, на вежу) з назвами веж із PEGS
+    :param chunk_size: Розмір блоку в байтах
+    :return: Генератор блоків bytes, разом (кількість ходів + 1) // 2 байтів
+    """
+    codes = {(a, b): PEGS.index(a) * 3 + PEGS.index(b) for a in PEGS for b in PEGS if a != b}
+    data = bytearray()
+    high = None
+    for _, from_peg, to_peg in moves:
+        code = codes[(from_peg, to_peg)]
+        if high is None:
+            high = code
+        else:
+            data.append(high << 4 | code)
+            high = None
+            if len(data) == chunk_size:
+                yield bytes(data)
+                data.clear()
+    if high is not None:
+        data.append(high << 4 | PAD_NIBBLE)
+    if data:
+        yield bytes(data)
+
+def decode_moves(data):
+    """
+    Розпаковує ходи, закодовані encode_moves, для оптимальної послідовності з першого ходу.
+
+    :param data: bytes або ітерабельний об'єкт блоків bytes з encode_moves
+    :return: Генератор трійок (диск, з вежі, на вежу)
+    """
+    chunks = (data,) if isinstance(data, (bytes, bytearray)) else data
+    m = 0
+    for chunk in chunks:
+        for byte in chunk:
+            for code in (byte >> 4, byte & 0xF):
+                if code == PAD_NIBBLE:
+                    return
+                m += 1
+                yield (m & -m).bit_length(), PEGS[code // 3], PEGS[code % 3]
+
+class FrameStewartTable:
+    """
+    Таблиця Фрейма-Стюарта: мінімальна кількість ходів moves[k][n] і найкраще розбиття splits[k][n].
+
+    Для k веж верхні t дисків переносяться на допоміжну вежу всіма k вежами, решта n - t -
+    на цільову k - 1 вежами, після чого t дисків повертаються наверх. Таблиця будується
+    знизу вгору, без рекурсії. Найкраще t не зменшується зі зростанням n, а сума
+    2 * moves[k][t] + moves[k - 1][n - t] спадає, а потім зростає, тож пошук кожного
+    розбиття продовжується з попереднього.
+    """
+
+    def __init__(self, max_disks, max_pegs):
+        """
+        :param max_disks: Найбільша кількість дисків
+        :param max_pegs: Найбільша кількість веж (не менше 3)
+        """
+        if max_pegs < 3:
+            raise ValueError("Потрібно щонайменше 3 вежі")
+        self.max_disks = max_disks
+        self.max_pegs = max_pegs
+        self.moves = [None] * 3 + [[2**n - 1 for n in range(max_disks + 1)]]
+        self.splits = [None] * 3 + [[max(n - 1, 0) for n in range(max_disks + 1)]]
+        for k in range(4, max_pegs + 1):
+            fewer = self.moves[k - 1]
+            moves = [0] * (max_disks + 1)
+            splits = [0] * (max_disks + 1)
+            t = 0
+            for n in range(1, max_disks + 1):
+                while t + 1 < n and 2 * moves[t + 1] + fewer[n - t - 1] <= 2 * moves[t] + fewer[n - t]:
+                    t += 1
+                moves[n] = 2 * moves[t] + fewer[n - t]
+                splits[n] = t
+            self.moves.append(moves)
+            self.splits.append(splits)
+
+    def covers(self, n, k):
+        return n <= self.max_disks and 3 <= k <= self.max_pegs
+
+def iter_multipeg_moves(n, pegs=('A', 'B', 'C', 'D'), table=None):
+    """
+    Генерує ходи розв'язку Фрейма-Стюарта для довільної кількості веж.
+
+    Підзадачі зберігаються у явному стеку, тому обмеження глибини рекурсії немає. Перша вежа
+    в pegs - початкова, друга - цільова, решта - допоміжні.
+
+    :param n: Кількість дисків
+    :param pegs: Назви веж (не менше 3)
+    :param table: FrameStewartTable; None - побудувати для n і len(pegs)
+    :return: Генератор трійок (диск, з вежі, на вежу)
     """
-    Ініціалізує вежі та запускає рекурсивну функцію для вирішення задачі.
+    if table is None or not table.covers(n, len(pegs)):
+        table = FrameStewartTable(n, len(pegs))
+    source, target, *spares = pegs
+    # Підзадача: перенести count дисків, найменший з яких offset + 1
+    stack = [(n, 0, source, target, tuple(spares))]
+    while stack:
+        count, offset, source, target, spares = stack.pop()
+        if count == 0:
+            continue
+        if len(spares) == 1:
+            for disk, from_peg, to_peg in iter_hanoi_moves(count, source, target, spares[0]):
+                yield disk + offset, from_peg, to_peg
+            continue
+        top = table.splits[len(spares) + 2][count]
+        aux, rest = spares[0], spares[1:]
+        # Підзадачі кладуться у зворотному порядку виконання
+        stack.append((top, offset, aux, target, rest + (source,)))
+        stack.append((count - top, offset + top, source, target, rest))
+        stack.append((top, offset, source, aux, rest + (target,)))
+
+def peg_names(count):
+    """
+    Назви веж A, B, C, ... для заданої кількості веж.
+    """
+    return tuple(chr(ord('A') + i) for i in range(count))
+
+def hanoi_tower_func(n, verbose=False, pegs=3, out=None):
+    """
+    Ініціалізує вежі та розв'язує задачу ітеративним генератором ходів.
+
+    Для більш ніж трьох веж використовується розв'язок Фрейма-Стюарта. Диски завжди
+    переносяться з першої вежі на останню.
 
     :param n: Кількість дисків
+    :param verbose: Виводити стани веж і кожне переміщення (буферизовано)
+    :param pegs: Кількість веж
+    :param out: Текстовий потік для виводу; None - sys.stdout
+    :return: Словник веж після розв'язання
     """
-    # Ініціалізація веж
-    pegs = {
-        'A': list(range(n, 0, -1)),  # Вежа A містить диски від n до 1
-        'B': [],
-        'C': []
-    }
-    print("Початковий стан веж:")
-    print(pegs)
-    print("\nПослідовність переміщень:")
-    hanoi_recursive(n, 'A', 'C', 'B', pegs)
-    print("\nФінальний стан веж:")
-    print(pegs)
-
-# Виклик функції для 3 дисків 
-hanoi_tower_func(3)
+    out = out or sys.stdout
+    names = peg_names(pegs)
+    # Ініціалізація веж: перша вежа містить диски від n до 1
+    state = PegState(n, names, names[0])
+    if pegs == 3:
+        moves = iter_hanoi_moves(n, 'A', 'C', 'B')
+    else:
+        moves = iter_multipeg_moves(n, (names[0], names[-1]) + names[1:-1])
+    if verbose:
+        print("Початковий стан веж:", file=out)
+        print(state.as_dict(), file=out)
+        print("\nПослідовність переміщень:", file=out)
+        moves = echo_moves(moves, out)
+    state.apply_all(moves)
+    if verbose:
+        print("\nФінальний стан веж:", file=out)
+        print(state.as_dict(), file=out)
+    return state.as_dict()
+
+def parse_arguments():
+    """
+    Парсинг аргументів командного рядка.
+    """
+    parser = argparse.ArgumentParser(description="Розв'язує задачу Ханойських веж і виводить або зберігає ходи.")
+    parser.add_argument("--disks", type=int, default=3, help="Кількість дисків.")
+    parser.add_argument("--pegs", type=int, default=3, help="Кількість веж (більше 3 - алгоритм Фрейма-Стюарта).")
+    parser.add_argument("--output", default=None, help="Файл для ходів (за замовчуванням - стандартний вивід).")
+    parser.add_argument("--format", choices=('text', 'binary'), default='text',
+                        help="Формат ходів: текст або двійкове кодування encode_moves (лише 3 вежі, потрібен --output).")
+    parser.add_argument("--quiet", action="store_true", help="Не виводити ходи, лише підсумок.")
+    add_measure_arguments(parser)
+    args = parser.parse_args()
+    if args.disks < 0:
+        parser.error("--disks має бути невід'ємним.")
+    if args.pegs < 3:
+        parser.error("--pegs має бути не менше 3.")
+    if args.format == 'binary' and (args.pegs != 3 or not args.output):
+        parser.error("--format binary підтримує лише 3 вежі і потребує --output.")
+    return args
+
+def run(args):
+    """
+    Розв'язує задачу з параметрами командного рядка.
+
+    :return: Кількість ходів
+    """
+    if args.format == 'binary':
+        with open(args.output, "wb") as f:
+            # Блоки пишуться одразу після кодування, без збирання всього файлу в пам'яті
+            f.writelines(encode_moves(iter_hanoi_moves(args.disks)))
+        return 2**args.disks - 1
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        hanoi_tower_func(args.disks, verbose=not args.quiet, pegs=args.pegs, out=out)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    if args.pegs == 3:
+        return 2**args.disks - 1
+    return FrameStewartTable(args.disks, args.pegs).moves[args.pegs][args.disks]
+
+def main():
+    args = parse_arguments()
+    try:
+        moves = run_measured(run, args, timed=args.time, profile=args.profile)
+    except OSError as e:
+        print(f"Не вдалося записати ходи: {e}")
+        sys.exit(1)
+    if args.quiet or args.output:
+        print(f"Розв'язано: {args.disks} дисків, {args.pegs} веж, {moves} ходів.")
+
+if __name__ == "__main__":
+    # Виклик функції для 3 дисків (або з параметрами командного рядка)
+    main()
@@ -0,0 +1,340 @@
+import os
+import sys
+import json
+import math
+import time
+import random
+import shutil
+import argparse
+import tempfile
+from array import array
+from pathlib import Path
+
+import Task1
+import Task2
+import Task3
+
+# Профілі синтетичних дерев: (кількість файлів, розмір файлу в байтах, глибина вкладеності)
+TREE_PROFILES = {
+    'small': (5000, 1024, 3),          # багато дрібних файлів
+    'huge': (4, 64 * 1024 * 1024, 1),  # кілька великих файлів
+    'deep': (500, 4096, 200),          # глибока вкладеність
+}
+
+EXTENSIONS = ('txt', 'py', 'jpg', 'pdf', 'json', 'csv', '')
+
+# Набори вимірювань: копіювання Task1, побудова фракталів Task2 і ходи Ханойських веж Task3
+SUITES = ('copy', 'fractals', 'hanoi')
+
+# У скільки разів зростає кількість відрізків за один крок переписування
+LSYSTEM_GROWTH = {'dragon': 2, 'levy-c': 2, 'sierpinski-arrowhead': 3, 'quadratic-koch': 5}
+
+def parse_arguments():
+    """
+    Парсинг аргументів командного рядка для бенчмарку.
+    """
+    parser = argparse.ArgumentParser(description="Вимірює швидкість обходу та копіювання Task1 на синтетичних деревах "
+                                                 "і побудови фракталів Task2.")
+    parser.add_argument("--suites", nargs='+', choices=SUITES, default=list(SUITES), help="Набори вимірювань.")
+    parser.add_argument("--profiles", nargs='+', choices=sorted(TREE_PROFILES), default=sorted(TREE_PROFILES),
+                        help="Профілі дерев для вимірювання.")
+    parser.add_argument("--scale", type=float, default=1.0, help="Множник кількості файлів у профілях.")
+    parser.add_argument("--seed", type=int, default=42, help="Зерно генератора випадкових чисел (для відтворюваності).")
+    parser.add_argument("--repeat", type=int, default=3, help="Кількість повторів; у звіт іде найкращий результат.")
+    parser.add_argument("--workers", type=int, nargs='+', default=[1, 8], help="Кількість потоків копіювання для перевірки.")
+    parser.add_argument("--fractal-orders", type=int, nargs='+', default=[5, 7],
+                        help="Порядки сніжинки Коха та L-систем для вимірювання.")
+    parser.add_argument("--hanoi-moves", type=int, default=2**20,
+                        help="Приблизна кількість ходів у кожному вимірюванні Ханойських веж.")
+    parser.add_argument("--hanoi-tables", type=int, nargs=2, action='append', default=None, metavar=("DISKS", "PEGS"),
+                        help="Розміри таблиць Фрейма-Стюарта для вимірювання часу побудови (можна повторювати).")
+    parser.add_argument("--workdir", default=None, help="Директорія для тимчасових дерев (за замовчуванням - системна).")
+    parser.add_argument("--json", default=None, help="Файл для збереження результатів у форматі JSON.")
+    return parser.parse_args()
+
+def generate_tree(root: Path, files: int, size: int, depth: int, seed: int):
+    """
+    Створює відтворюване синтетичне дерево файлів.
+
+    :param root: Коренева директорія дерева.
+    :param files: Кількість файлів.
+    :param size: Розмір кожного файлу в байтах.
+    :param depth: Максимальна глибина вкладеності директорій.
+    :param seed: Зерно генератора випадкових чисел.
+    """
+    rng = random.Random(seed)
+    directories = [root]
+    current = root
+    for level in range(depth - 1):
+        current = current / f"d{level}"
+        directories.append(current)
+    for directory in directories:
+        directory.mkdir(parents=True, exist_ok=True)
+
+    # Один блок випадкових даних на всі файли - генерація не повинна домінувати в часі підготовки
+    block = rng.randbytes(min(size, 1024 * 1024))
+    for index in range(files):
+        extension = rng.choice(EXTENSIONS)
+        name = f"file{index}.{extension}" if extension else f"file{index}"
+        with open(rng.choice(directories) / name, "wb") as f:
+            remaining = size
+            while remaining > 0:
+                chunk = block[:remaining]
+                f.write(chunk)
+                remaining -= len(chunk)
+
+def legacy_walk(source_dir: Path):
+    """
+    Обхід у стилі початкової версії recursive_copy (Path.iterdir + is_dir/is_file) для порівняння.
+    """
+    count = 0
+    for item in source_dir.iterdir():
+        if Task1.is_ignored(item):
+            continue
+        if item.is_dir():
+            if item.name in Task1.IGNORE_DIRS:
+                continue
+            count += legacy_walk(item)
+        elif item.is_file():
+            # Початковий copy_file перевіряв is_file() ще раз
+            if item.is_file():
+                count += 1
+    return count
+
+def best_time(func, repeat: int) -> float:
+    """
+    Виконує функцію кілька разів і повертає найменший час виконання.
+    """
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - started)
+    return min(times)
+
+def bench_profile(name: str, source: Path, workdir: Path, files: int, total_bytes: int, args) -> list:
+    """
+    Вимірює всі стратегії обходу та копіювання на одному дереві.
+
+    :return: Список результатів {profile, case, seconds, files_per_s, mb_per_s}.
+    """
+    results = []
+
+    def record(case, seconds, with_bytes=True):
+        results.append({
+            "profile": name,
+            "case": case,
+            "seconds": round(seconds, 4),
+            "files_per_s": round(files / seconds, 1) if seconds else None,
+            "mb_per_s": round(total_bytes / seconds / 2**20, 2) if seconds and with_bytes else None,
+        })
+
+    record("walk: Path.iterdir (початкова версія)", best_time(lambda: legacy_walk(source), args.repeat), False)
+    record("walk: walk_source (os.scandir)", best_time(lambda: sum(1 for _ in Task1.walk_source(source)), args.repeat),
+           False)
+
+    for strategy in Task1.COPY_STRATEGIES:
+        for workers in args.workers:
+            destination = workdir / f"dst-{name}"
+
+            def run():
+                shutil.rmtree(destination, ignore_errors=True)
+                Task1.copy_and_sort_files(os.fspath(source), os.fspath(destination), workers=workers,
+                                          copy_strategy=strategy, log_level="WARNING", progress_interval=0)
+
+            record(f"copy: {strategy}, workers={workers}", best_time(run, args.repeat))
+            shutil.rmtree(destination, ignore_errors=True)
+
+    destination = workdir / f"dst-{name}"
+
+    def run_async():
+        shutil.rmtree(destination, ignore_errors=True)
+        Task1.copy_and_sort_files(os.fspath(source), os.fspath(destination), use_async=True,
+                                  log_level="WARNING", progress_interval=0)
+
+    record("copy: async", best_time(run_async, args.repeat))
+    shutil.rmtree(destination, ignore_errors=True)
+    return results
+
+class RecordingTurtle:
+    """
+    Мінімальна заміна turtle.Turtle без вікна: записує вершини так само, як їх проходить черепашка.
+    """
+
+    def __init__(self, x=0.0, y=0.0):
+        self.heading = 0.0
+        self.x = x
+        self.y = y
+        self.points = array('d', (x, y))
+
+    def forward(self, distance):
+        angle = math.radians(self.heading)
+        self.x += distance * math.cos(angle)
+        self.y += distance * math.sin(angle)
+        self.points.extend((self.x, self.y))
+
+    def left(self, angle):
+        self.heading += angle
+
+    def right(self, angle):
+        self.heading -= angle
+
+def turtle_snowflake(order: int, size: float):
+    """
+    Сніжинка Коха початковою рекурсивною функцією koch_curve, як у draw_koch_snowflake до оптимізацій.
+    """
+    t = RecordingTurtle(-size / 2, size / (2 * 3**0.5))
+    for _ in range(3):
+        Task2.koch_curve(t, order, size)
+        t.right(120)
+    return t.points
+
+def bench_fractals(orders: list, repeat: int) -> list:
+    """
+    Порівнює рекурсивний шлях через turtle з ітеративними побудовами та L-системами.
+
+    :return: Список результатів {profile, case, seconds, vertices, vertices_per_s}.
+    """
+    results = []
+
+    def record(order, case, build):
+        vertices = 0
+
+        def run():
+            nonlocal vertices
+            points = build()
+            vertices = len(points) // 2 if isinstance(points, array) else sum(1 for _ in points)
+
+        seconds = best_time(run, repeat)
+        results.append({
+            "profile": f"order={order}",
+            "case": case,
+            "seconds": round(seconds, 4),
+            "vertices": vertices,
+            "vertices_per_s": round(vertices / seconds) if seconds else None,
+        })
+
+    snowflake = Task2.LSYSTEM_PRESETS['koch-snowflake']
+    for order in orders:
+        size = 300
+        top = size / (2 * 3**0.5)
+        record(order, "koch: koch_curve + turtle (рекурсія)", lambda: turtle_snowflake(order, size))
+        record(order, "koch: subdivide без кешу",
+               lambda: Task2.koch_snowflake_points(order, size, Task2.KochCurveCache(0)))
+        record(order, "koch: KochCurveCache", lambda: Task2.koch_snowflake_points(order, size))
+        record(order, "koch: iter_koch_snowflake_points", lambda: Task2.iter_koch_snowflake_points(order, size))
+        record(order, "koch: L-система", lambda: snowflake.points(order, size / 3**order, -size / 2, top))
+        for name, growth in LSYSTEM_GROWTH.items():
+            # Порядок підбирається так, щоб вершин було приблизно стільки ж, скільки в кривій Коха
+            equivalent = round(order * math.log(4) / math.log(growth))
+            record(order, f"L-система: {name}, порядок {equivalent}",
+                   lambda: Task2.LSYSTEM_PRESETS[name].points(equivalent))
+    return results
+
+def print_fractal_results(results: list):
+    """
+    Виводить результати побудови фракталів таблицею.
+    """
+    print(f"{'Порядок':<10} {'Варіант':<42} {'Секунд':>9} {'Вершин':>10} {'Вершин/с':>12}")
+    for result in results:
+        print(f"{result['profile']:<10} {result['case']:<42} {result['seconds']:>9} "
+              f"{result['vertices']:>10} {result['vertices_per_s']:>12}")
+
+def bench_hanoi(total_moves: int, tables: list, repeat: int) -> list:
+    """
+    Вимірює генерацію ходів для 3 веж і розв'язувач Фрейма-Стюарта для більшої кількості веж.
+
+    :param total_moves: Приблизна кількість ходів у кожному вимірюванні.
+    :param tables: Пари (кількість дисків, кількість веж) для побудови таблиць.
+    :return: Список результатів {profile, case, seconds, moves, moves_per_s}.
+    """
+    results = []
+
+    def record(profile, case, func, moves):
+        seconds = best_time(func, repeat)
+        results.append({
+            "profile": profile,
+            "case": case,
+            "seconds": round(seconds, 4),
+            "moves": moves,
+            "moves_per_s": round(moves / seconds) if seconds and moves else None,
+        })
+
+    n = max(1, total_moves.bit_length() - 1)
+    moves = 2**n - 1
+
+    def recursive():
+        pegs = {'A': list(range(n, 0, -1)), 'B': [], 'C': []}
+        Task3.hanoi_recursive(n, 'A', 'C', 'B', pegs, lambda a, b, p: p[b].append(p[a].pop()))
+
+    record("pegs=3", f"hanoi_recursive без виводу, n={n}", recursive, moves)
+    record("pegs=3", f"iter_hanoi_moves, n={n}", lambda: sum(1 for _ in Task3.iter_hanoi_moves(n)), moves)
+    record("pegs=3", f"validate_moves, n={n}", lambda: Task3.validate_moves(n, Task3.iter_hanoi_moves(n)), moves)
+
+    for disks, pegs in tables:
+        record(f"pegs={pegs}", f"FrameStewartTable, дисків={disks}", lambda: Task3.FrameStewartTable(disks, pegs), None)
+
+    for pegs in (4, 5, 6):
+        # Найбільше n, для якого розв'язок не довший за total_moves
+        table = Task3.FrameStewartTable(1024, pegs)
+        n = max(i for i, count in enumerate(table.moves[pegs]) if count <= total_moves)
+        names = tuple(chr(ord('A') + i) for i in range(pegs))
+        record(f"pegs={pegs}", f"iter_multipeg_moves, n={n}",
+               lambda: sum(1 for _ in Task3.iter_multipeg_moves(n, names, table)), table.moves[pegs][n])
+    return results
+
+def print_hanoi_results(results: list):
+    """
+    Виводить результати вимірювань Ханойських веж таблицею.
+    """
+    print(f"{'Веж':<8} {'Варіант':<42} {'Секунд':>9} {'Ходів':>10} {'Ходів/с':>12}")
+    for result in results:
+        moves = result["moves"] if result["moves"] is not None else "-"
+        moves_per_s = result["moves_per_s"] if result["moves_per_s"] is not None else "-"
+        print(f"{result['profile']:<8} {result['case']:<42} {result['seconds']:>9} "
+              f"{moves:>10} {moves_per_s:>12}")
+
+def print_results(results: list):
+    """
+    Виводить результати таблицею.
+    """
+    print(f"{'Профіль':<8} {'Варіант':<42} {'Секунд':>9} {'Файлів/с':>11} {'МБ/с':>9}")
+    for result in results:
+        mb_per_s = result["mb_per_s"] if result["mb_per_s"] is not None else "-"
+        print(f"{result['profile']:<8} {result['case']:<42} {result['seconds']:>9} "
+              f"{result['files_per_s']:>11} {mb_per_s:>9}")
+
+def main():
+    args = parse_arguments()
+    results = []
+    if 'copy' in args.suites:
+        workdir = Path(tempfile.mkdtemp(prefix="task1-bench-", dir=args.workdir))
+        try:
+            for name in args.profiles:
+                files, size, depth = TREE_PROFILES[name]
+                files = max(1, int(files * args.scale))
+                source = workdir / f"src-{name}"
+                generate_tree(source, files, size, depth, args.seed)
+                results.extend(bench_profile(name, source, workdir, files, files * size, args))
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+        print_results(results)
+
+    fractals = []
+    if 'fractals' in args.suites:
+        fractals = bench_fractals(args.fractal_orders, args.repeat)
+        print_fractal_results(fractals)
+
+    hanoi = []
+    if 'hanoi' in args.suites:
+        tables = args.hanoi_tables or [(1000, 4), (1000, 8), (10000, 4), (10000, 8)]
+        hanoi = bench_hanoi(args.hanoi_moves, tables, args.repeat)
+        print_hanoi_results(hanoi)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"python": sys.version, "seed": args.seed, "scale": args.scale, "results": results,
+                       "fractals": fractals, "hanoi": hanoi}, f, ensure_ascii=False, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,430 @@
+import asyncio
+import errno
+import hashlib
+import io
+import json
+import os
+import shutil
+import tarfile
+import tempfile
+import unittest
+import zipfile
+from contextlib import redirect_stderr, redirect_stdout
+from pathlib import Path
+from unittest.mock import patch
+
+import Task1
+
+
+class SortTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp(prefix="task1-test-"))
+        self.src = self.tmp / "src"
+        self.dst = self.tmp / "dst"
+        self.src.mkdir()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def write(self, rel_path: str, content: str):
+        path = self.src / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+        return path
+
+    def sort(self, destination: Path = None, **options) -> list:
+        """
+        Запускає сортування без виводу в консоль і повертає повідомлення про помилки з журналу JSON.
+        """
+        log_path = self.tmp / "run.jsonl"
+        with redirect_stdout(io.StringIO()):
+            Task1.copy_and_sort_files(os.fspath(self.src), os.fspath(destination or self.dst),
+                                      log_level="CRITICAL", log_json=os.fspath(log_path),
+                                      progress_interval=0, **options)
+        with open(log_path, encoding="utf-8") as f:
+            events = [json.loads(line) for line in f]
+        return [event["message"] for event in events if event["level"] == "ERROR"]
+
+    def tree(self, root: Path = None) -> dict:
+        """
+        Повертає вміст дерева призначення як {відносний шлях: текст}, без службових файлів (маніфест, звіт).
+        """
+        root = root or self.dst
+        result = {}
+        for path in root.rglob("*"):
+            if path.is_file() and not path.name.startswith("."):
+                result[path.relative_to(root).as_posix()] = path.read_text()
+        return result
+
+
+class TestIgnoreRules(unittest.TestCase):
+
+    def rules(self, *lines) -> Task1.IgnoreRules:
+        rules = Task1.IgnoreRules(include_defaults=False)
+        for line in lines:
+            rules.add_line(line)
+        return rules
+
+    def assertIgnored(self, rules, *paths, is_dir=False):
+        for path in paths:
+            self.assertIsNotNone(rules.match(path, is_dir), path)
+
+    def assertKept(self, rules, *paths, is_dir=False):
+        for path in paths:
+            self.assertIsNone(rules.match(path, is_dir), path)
+
+    def test_last_matching_rule_wins(self):
+        rules = self.rules("*.log", "!keep.log")
+        self.assertIgnored(rules, "a.log", "dir/b.log")
+        self.assertKept(rules, "keep.log", "dir/keep.log")
+        rules = self.rules("!keep.log", "*.log")
+        self.assertIgnored(rules, "keep.log")
+        # Заперечення з шаблоном після простого імені
+        rules = self.rules("debug.log", "!*.log")
+        self.assertKept(rules, "debug.log")
+        self.assertEqual(self.rules("*.log", "!keep.log", "keep.log").match("keep.log"), "keep.log")
+
+    def test_dir_only_rules(self):
+        rules = self.rules("build/", "cache*/")
+        self.assertIgnored(rules, "build", "src/build", "cache1", is_dir=True)
+        self.assertKept(rules, "build", "cache1")
+
+    def test_anchored_rules(self):
+        rules = self.rules("/build", "doc/*.txt")
+        self.assertIgnored(rules, "build", "doc/a.txt")
+        self.assertKept(rules, "src/build", "x/doc/a.txt", "doc/sub/a.txt")
+
+    def test_double_star(self):
+        rules = self.rules("**/tmp", "a/**/b")
+        self.assertIgnored(rules, "tmp", "x/y/tmp", "a/b", "a/x/b", "a/x/y/b")
+        self.assertKept(rules, "tmpx", "c/a/b", "a/bc")
+
+    def test_character_classes_and_escapes(self):
+        rules = self.rules("file[!0-9].txt", "\\#notes", "[ab]?.md")
+        self.assertIgnored(rules, "filea.txt", "#notes", "a1.md", "sub/bz.md")
+        self.assertKept(rules, "file1.txt", "notes", "c1.md", "a12.md")
+
+    def test_comments_and_blank_lines(self):
+        rules = self.rules("# comment", "", "   ", "*.tmp  ")
+        self.assertEqual(rules.match("# comment"), None)
+        self.assertEqual(rules.match("a.tmp"), "*.tmp")
+        self.assertEqual(len(rules._rules), 1)
+
+
+class TestCopyData(SortTestCase):
+
+    def test_copy_after_hardlink_run_keeps_source(self):
+        source = self.write("a.txt", "original data")
+        self.sort(mode="hardlink")
+        errors = self.sort()
+        self.assertEqual(source.read_text(), "original data")
+        self.assertEqual(len(errors), 1)
+        self.assertIn("той самий файл", errors[0])
+
+    def test_copy_replaces_target_instead_of_writing_into_it(self):
+        self.write("a.txt", "new")
+        other = self.tmp / "other.txt"
+        other.write_text("keep me")
+        (self.dst / "txt").mkdir(parents=True)
+        os.link(other, self.dst / "txt" / "a.txt")
+        self.assertEqual(self.sort(on_collision="overwrite"), [])
+        self.assertEqual(other.read_text(), "keep me")
+        self.assertEqual((self.dst / "txt" / "a.txt").read_text(), "new")
+
+
+    @unittest.skipUnless(hasattr(os, "copy_file_range"), "потрібен os.copy_file_range")
+    def test_short_fast_copy_falls_back(self):
+        self.write("a.txt", "x" * 10000)
+        real = os.copy_file_range
+
+        def short(src, dst, count, offset_src=None, offset_dst=None):
+            # Копіює лише перший блок, а далі повертає 0, як на ФС без підтримки
+            if offset_src:
+                return 0
+            return real(src, dst, min(count, 100), offset_src, offset_dst)
+
+        copier = Task1.FileCopier("copy_file_range")
+        (self.dst / "txt").mkdir(parents=True)
+        with patch("os.copy_file_range", short):
+            copier.copy(self.src / "a.txt", self.dst / "txt" / "a.txt")
+        self.assertEqual((self.dst / "txt" / "a.txt").read_text(), "x" * 10000)
+        self.assertEqual(set(copier._stats), {"buffered"})
+
+
+class TestTransferModes(SortTestCase):
+
+    def test_move_removes_source(self):
+        source = self.write("a.txt", "data")
+        inode = source.stat().st_ino
+        self.assertEqual(self.sort(mode="move"), [])
+        self.assertFalse(source.exists())
+        self.assertEqual((self.dst / "txt" / "a.txt").stat().st_ino, inode)
+        self.assertEqual(self.tree(), {"txt/a.txt": "data"})
+
+    def test_hardlink(self):
+        source = self.write("a.txt", "data")
+        self.assertEqual(self.sort(mode="hardlink"), [])
+        target = self.dst / "txt" / "a.txt"
+        self.assertTrue(os.path.samefile(source, target))
+        self.assertEqual(source.stat().st_nlink, 2)
+
+    def test_symlink(self):
+        source = self.write("a.txt", "data")
+        self.assertEqual(self.sort(mode="symlink"), [])
+        target = self.dst / "txt" / "a.txt"
+        self.assertTrue(target.is_symlink())
+        self.assertEqual(os.readlink(target), os.path.abspath(source))
+        self.assertEqual(target.read_text(), "data")
+
+    def cross_device(self, real):
+        """
+        Обгортка для os.replace/os.link, яка для файлів джерела поводиться як перенесення на інший пристрій.
+        """
+        def call(source, target, *args, **kwargs):
+            if os.fspath(source).startswith(os.fspath(self.src)):
+                raise OSError(errno.EXDEV, os.strerror(errno.EXDEV))
+            return real(source, target, *args, **kwargs)
+        return call
+
+    def test_move_across_devices_copies_and_unlinks(self):
+        source = self.write("a.txt", "data")
+        inode = source.stat().st_ino
+        with patch("os.replace", self.cross_device(os.replace)):
+            self.assertEqual(self.sort(mode="move"), [])
+        self.assertFalse(source.exists())
+        self.assertNotEqual((self.dst / "txt" / "a.txt").stat().st_ino, inode)
+        self.assertEqual(self.tree(), {"txt/a.txt": "data"})
+
+    def test_hardlink_across_devices_copies(self):
+        source = self.write("a.txt", "data")
+        with patch("os.link", self.cross_device(os.link)):
+            self.assertEqual(self.sort(mode="hardlink"), [])
+        target = self.dst / "txt" / "a.txt"
+        self.assertEqual(target.read_text(), "data")
+        self.assertFalse(os.path.samefile(source, target))
+        self.assertEqual(source.stat().st_nlink, 1)
+
+
+class TestIgnoreFiles(SortTestCase):
+
+    def test_walk_prunes_ignored_directories(self):
+        self.write("keep.txt", "1")
+        self.write("build/out.txt", "2")
+        self.write("build/deep/more.txt", "3")
+        self.write("src/build/nested.txt", "4")
+        self.write("src/main.py", "5")
+        rules = Task1.IgnoreRules()
+        rules.add_line("/build/")
+        with patch.object(Task1, "scan_directory", wraps=Task1.scan_directory) as scan:
+            found = sorted(Path(entry.path).relative_to(self.src).as_posix()
+                           for entry in Task1.walk_source(self.src, rules))
+        self.assertEqual(found, ["keep.txt", "src/build/nested.txt", "src/main.py"])
+        scanned = {Path(call.args[0]).relative_to(self.src).as_posix() for call in scan.call_args_list}
+        self.assertEqual(scanned, {".", "src", "src/build"})
+
+    def test_ignore_file_option(self):
+        self.write("a.txt", "a")
+        self.write("b.log", "b")
+        self.write("logs/keep.log", "c")
+        self.write("tmp/c.txt", "d")
+        rules_path = self.tmp / "rules"
+        rules_path.write_text("# журнали\n*.log\n!keep.log\n\ntmp/\n")
+        self.assertEqual(self.sort(ignore_files=[os.fspath(rules_path)]), [])
+        self.assertEqual(self.tree(), {"txt/a.txt": "a", "log/keep.log": "c"})
+
+    def test_missing_ignore_file(self):
+        self.write("a.txt", "a")
+        with redirect_stdout(io.StringIO()), self.assertRaises(SystemExit):
+            Task1.copy_and_sort_files(os.fspath(self.src), os.fspath(self.dst),
+                                      ignore_files=[os.fspath(self.tmp / "missing")])
+
+
+class TestCollisionPolicies(SortTestCase):
+    # Файли директорії обходяться раніше за її піддиректорії, тож "x.txt" іде перед "a/X.txt"
+
+    def write_pair(self, first_mtime: int = None, second_mtime: int = None):
+        first = self.write("x.txt", "first")
+        second = self.write("a/X.txt", "second")
+        if first_mtime is not None:
+            os.utime(first, ns=(first_mtime, first_mtime))
+            os.utime(second, ns=(second_mtime, second_mtime))
+
+    def test_suffix_is_case_insensitive(self):
+        self.write_pair()
+        self.assertEqual(self.sort(on_collision="suffix"), [])
+        self.assertEqual(self.tree(), {"txt/x.txt": "first", "txt/X_1.txt": "second"})
+
+    def test_skip(self):
+        self.write_pair()
+        self.assertEqual(self.sort(on_collision="skip"), [])
+        self.assertEqual(self.tree(), {"txt/x.txt": "first"})
+
+    def test_newest_keeps_newer_file(self):
+        self.write_pair(10**18, 2 * 10**18)
+        self.assertEqual(self.sort(on_collision="newest"), [])
+        self.assertEqual(self.tree(), {"txt/x.txt": "second"})
+
+    def test_newest_ignores_older_file(self):
+        self.write_pair(2 * 10**18, 10**18)
+        self.assertEqual(self.sort(on_collision="newest"), [])
+        self.assertEqual(self.tree(), {"txt/x.txt": "first"})
+
+    def test_hash(self):
+        self.write_pair()
+        self.assertEqual(self.sort(on_collision="hash"), [])
+        digest = hashlib.sha256(b"second").hexdigest()[:8]
+        self.assertEqual(self.tree(), {"txt/x.txt": "first", f"txt/X-{digest}.txt": "second"})
+
+    def test_overwrite(self):
+        self.write_pair()
+        self.assertEqual(self.sort(on_collision="overwrite"), [])
+        self.assertEqual(self.tree(), {"txt/x.txt": "second"})
+
+
+
+class TestDedupe(SortTestCase):
+    # Файли директорії обходяться раніше за її піддиректорії, тож глибина задає порядок обробки
+
+    def test_incremental_rerun_does_not_write_through_link(self):
+        self.write("x.txt", "same")
+        duplicate = self.write("a/y.txt", "same")
+        self.assertEqual(self.sort(dedupe="hardlink", incremental=True), [])
+        duplicate.write_text("changed")
+        os.utime(duplicate, ns=(0, 10**18))
+        self.assertEqual(self.sort(dedupe="hardlink", incremental=True), [])
+        self.assertEqual(self.tree(), {"txt/x.txt": "same", "txt/y.txt": "changed"})
+
+    def test_overwrite_does_not_write_through_link(self):
+        self.write("x.txt", "same")
+        self.write("a/y.txt", "same")
+        self.write("a/b/x.txt", "other")
+        self.write("a/b/c/z.txt", "same")
+        self.assertEqual(self.sort(dedupe="hardlink", on_collision="overwrite"), [])
+        self.assertEqual(self.tree(), {"txt/x.txt": "other", "txt/y.txt": "same", "txt/z.txt": "same"})
+
+    def test_report_duplicate_has_no_destination(self):
+        self.write("x.txt", "same")
+        duplicate = self.write("a/y.txt", "same")
+        self.assertEqual(self.sort(dedupe="report", incremental=True), [])
+        self.assertEqual(self.tree(), {"txt/x.txt": "same"})
+        duplicate.write_text("changed")
+        os.utime(duplicate, ns=(0, 10**18))
+        self.assertEqual(self.sort(dedupe="report", incremental=True), [])
+        self.assertEqual(self.tree(), {"txt/x.txt": "same", "txt/y.txt": "changed"})
+
+
+class TestArchives(SortTestCase):
+
+    def write_zip(self, rel_path: str, members: dict):
+        path = self.src / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with zipfile.ZipFile(path, "w") as archive:
+            for name, content in members.items():
+                archive.writestr(name, content)
+        return path
+
+    def test_incremental_run_without_archives_after_extraction(self):
+        archive = self.write_zip("pack.zip", {"doc.txt": "from archive"})
+        self.assertEqual(self.sort(archives=True, incremental=True), [])
+        self.write_zip("pack.zip", {"doc.txt": "changed"})
+        os.utime(archive, ns=(0, 10**18))
+        self.assertEqual(self.sort(incremental=True), [])
+        self.assertEqual((self.dst / "txt" / "doc.txt").read_text(), "from archive")
+        self.assertTrue(zipfile.is_zipfile(self.dst / "zip" / "pack.zip"))
+
+    def test_later_file_does_not_overwrite_extracted_member(self):
+        self.write_zip("pack.zip", {"doc.txt": "from archive"})
+        self.assertEqual(self.sort(archives=True, incremental=True), [])
+        self.write("later/doc.txt", "regular file")
+        self.assertEqual(self.sort(archives=True, incremental=True), [])
+        self.assertEqual(self.tree(), {"txt/doc.txt": "from archive", "txt/doc_1.txt": "regular file"})
+
+    def test_truncated_archive_is_reported_and_retried(self):
+        archive = self.src / "pack.tar"
+        with tarfile.open(archive, "w") as tar:
+            for i in range(3):
+                data = os.urandom(20000)
+                info = tarfile.TarInfo(f"m{i}.bin")
+                info.size = len(data)
+                tar.addfile(info, io.BytesIO(data))
+        data = archive.read_bytes()
+        archive.write_bytes(data[:len(data) * 4 // 5])
+
+        errors = self.sort(archives=True, incremental=True)
+        self.assertEqual(len(errors), 1)
+        self.assertIn("pack.tar", errors[0])
+        self.assertEqual(sorted(os.listdir(self.dst / "bin")), ["m0.bin", "m1.bin"])
+        self.assertFalse((self.dst / "tar").exists())
+        # Архів не записано в маніфест, тож наступний запуск пробує його знову
+        self.assertEqual(len(self.sort(archives=True, incremental=True)), 1)
+
+    def test_changed_archive_replaces_its_members(self):
+        archive = self.write_zip("pack.zip", {"doc.txt": "old"})
+        self.assertEqual(self.sort(archives=True, incremental=True), [])
+        self.write_zip("pack.zip", {"doc.txt": "new"})
+        os.utime(archive, ns=(0, 10**18))
+        self.assertEqual(self.sort(archives=True, incremental=True), [])
+        self.assertEqual(self.tree(), {"txt/doc.txt": "new"})
+
+
+class TestWorkers(SortTestCase):
+
+    def write_same_names(self, count: int):
+        for i in range(count):
+            self.write(f"d{i}/same.txt", f"file {i}")
+
+    def test_threaded_layout_matches_serial(self):
+        self.write_same_names(300)
+        self.assertEqual(self.sort(self.tmp / "serial", incremental=True), [])
+        self.assertEqual(self.sort(workers=32, incremental=True), [])
+        self.assertEqual(self.tree(), self.tree(self.tmp / "serial"))
+
+    def test_threaded_overwrite_keeps_last_file(self):
+        self.write_same_names(100)
+        self.assertEqual(self.sort(self.tmp / "serial", on_collision="overwrite"), [])
+        self.assertEqual(self.sort(workers=32, on_collision="overwrite"), [])
+        self.assertEqual(self.tree(), self.tree(self.tmp / "serial"))
+
+    def test_async_layout_matches_serial(self):
+        self.write_same_names(300)
+        self.assertEqual(self.sort(self.tmp / "serial", incremental=True), [])
+        self.assertEqual(self.sort(use_async=True, incremental=True), [])
+        self.assertEqual(self.tree(), self.tree(self.tmp / "serial"))
+
+    def test_async_overwrite_keeps_last_file(self):
+        self.write_same_names(100)
+        self.assertEqual(self.sort(self.tmp / "serial", on_collision="overwrite"), [])
+        self.assertEqual(self.sort(use_async=True, on_collision="overwrite"), [])
+        self.assertEqual(self.tree(), self.tree(self.tmp / "serial"))
+
+    def test_async_rejects_unsupported_options(self):
+        self.write("a.txt", "data")
+        for options in ({"mode": "move"}, {"dedupe": "hardlink"}, {"archives": True},
+                        {"copy_strategy": "buffered"}):
+            with self.subTest(**options), self.assertRaises(ValueError):
+                self.sort(use_async=True, **options)
+        self.assertTrue((self.src / "a.txt").exists())
+        self.assertFalse(self.dst.exists())
+
+        session = Task1.SortSession(self.dst, copier=Task1.FileCopier("auto", "hardlink"))
+        with self.assertRaises(ValueError):
+            asyncio.run(Task1.async_copy(self.src, session))
+
+    def test_cli_rejects_copy_strategy_with_async(self):
+        argv = ["Task1.py", os.fspath(self.src), os.fspath(self.dst), "--async", "--copy-strategy", "buffered"]
+        with patch("sys.argv", argv), redirect_stderr(io.StringIO()), self.assertRaises(SystemExit):
+            Task1.parse_arguments()
+
+    def test_worker_exception_is_logged(self):
+        def fail():
+            raise RuntimeError("boom")
+
+        with self.assertLogs(Task1.logger, "ERROR") as logs:
+            with Task1.BoundedExecutor(2) as executor:
+                executor.submit(fail)
+        self.assertIn("boom", logs.output[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,261 @@
+import io
+import math
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+import zlib
+import xml.etree.ElementTree as ET
+from unittest.mock import patch
+
+import Task2
+from benchmarks import RecordingTurtle, turtle_snowflake
+
+# Допустима похибка координат відносно розміру фігури
+TOLERANCE = 1e-9
+
+
+def pairs(points):
+    """
+    Перетворює плаский масив x0, y0, x1, y1, ... на список пар (x, y).
+    """
+    return list(zip(points[0::2], points[1::2]))
+
+
+class PointsTestCase(unittest.TestCase):
+
+    def assertPointsAlmostEqual(self, actual, expected, scale=1.0):
+        actual = list(actual)
+        expected = list(expected)
+        self.assertEqual(len(actual), len(expected))
+        for i, (a, b) in enumerate(zip(actual, expected)):
+            if abs(a[0] - b[0]) > TOLERANCE * scale or abs(a[1] - b[1]) > TOLERANCE * scale:
+                self.fail(f"Вершина {i}: {a} != {b}")
+
+
+class TestIterKoch(PointsTestCase):
+
+    def test_curve_matches_turtle(self):
+        for order in range(6):
+            with self.subTest(order=order):
+                t = RecordingTurtle()
+                Task2.koch_curve(t, order, 300)
+                self.assertPointsAlmostEqual(Task2.iter_koch_curve(order, 0.0, 0.0, 300.0, 0.0),
+                                             pairs(t.points)[1:], 300)
+
+    def test_snowflake_matches_turtle(self):
+        for order in range(6):
+            with self.subTest(order=order):
+                self.assertPointsAlmostEqual(Task2.iter_koch_snowflake_points(order, 300),
+                                             pairs(turtle_snowflake(order, 300)), 300)
+
+    def test_culling_keeps_visible_vertices(self):
+        order, size = 5, 300
+        viewport = (0.0, 0.0, 60.0, 120.0)
+        xmin, ymin, xmax, ymax = viewport
+        # Без реального відсікання (уся сніжинка в області) iter_koch_curve дає ту саму арифметику
+        full = list(Task2.iter_koch_snowflake_points(order, size, Task2.default_viewport(size)))
+        self.assertEqual(len(full), 3 * 4**order + 1)
+        culled = list(Task2.iter_koch_snowflake_points(order, size, viewport))
+        self.assertLess(len(culled), len(full) // 2)
+
+        visible = {(round(x, 9), round(y, 9)) for x, y in full if xmin <= x <= xmax and ymin <= y <= ymax}
+        self.assertTrue(visible)
+        self.assertLessEqual(visible, {(round(x, 9), round(y, 9)) for x, y in culled})
+        self.assertEqual(culled[0], full[0])
+        self.assertEqual(culled[-1], full[-1])
+
+    def test_min_segment_stops_subdivision(self):
+        points = list(Task2.iter_koch_curve(6, 0.0, 0.0, 300.0, 0.0, min_segment=1.01 * 300 / 3**3))
+        self.assertEqual(len(points), 4**3)
+        self.assertEqual(points[-1], (300.0, 0.0))
+
+
+
+def unit_bytes(order):
+    """
+    Розмір одиничної кривої порядку order у кеші: 4**order + 1 вершин по два double.
+    """
+    return (4**order + 1) * 2 * 8
+
+
+class TestKochCurveCache(PointsTestCase):
+
+    def test_eviction_keeps_memory_limit(self):
+        limit = unit_bytes(3) + 50
+        cache = Task2.KochCurveCache(limit)
+        cache.unit(3)
+        # Порядки 0-2 витіснено, щоб вмістити порядок 3
+        self.assertEqual(len(cache), 1)
+        self.assertIn(3, cache)
+        self.assertEqual(cache.nbytes, unit_bytes(3))
+        cache.unit(1)
+        self.assertLessEqual(cache.nbytes, limit)
+        self.assertEqual(cache.nbytes, sum(unit_bytes(order) for order in range(5) if order in cache))
+
+    def test_oversize_order_is_not_stored(self):
+        cache = Task2.KochCurveCache(unit_bytes(3) - 1)
+        points = cache.unit(3)
+        self.assertEqual(len(points), 2 * (4**3 + 1))
+        self.assertNotIn(3, cache)
+        self.assertIn(2, cache)
+        self.assertLessEqual(cache.nbytes, cache.max_bytes)
+        self.assertEqual(list(Task2.KochCurveCache(0).unit(2)), list(cache.unit(2)))
+
+    def test_builds_from_highest_cached_order(self):
+        cache = Task2.KochCurveCache()
+        cache.unit(2)
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
+        with patch.object(Task2, "subdivide", wraps=Task2.subdivide) as subdivide:
+            points = cache.unit(4)
+        # Лише рівні 3 і 4 - рівень 2 взято з кешу
+        self.assertEqual(subdivide.call_count, 2)
+        self.assertEqual((cache.hits, cache.misses), (0, 2))
+        self.assertIs(cache.unit(4), points)
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+        self.assertEqual(list(points), list(Task2.KochCurveCache().unit(4)))
+
+    def test_snowflake_matches_turtle(self):
+        cache = Task2.KochCurveCache()
+        for order in range(6):
+            with self.subTest(order=order):
+                self.assertPointsAlmostEqual(pairs(cache.snowflake(order, 300)),
+                                             pairs(turtle_snowflake(order, 300)), 300)
+
+
+
+def turtle_lsystem(system, word, step=1.0, x=0.0, y=0.0):
+    """
+    Пряма інтерпретація рядка L-системи черепашкою, символ за символом.
+    """
+    heading = system.heading
+    points = [(x, y)]
+    for char in word:
+        if char in system.draw:
+            x += step * math.cos(math.radians(heading))
+            y += step * math.sin(math.radians(heading))
+            points.append((x, y))
+        elif char == "+":
+            heading += system.angle
+        elif char == "-":
+            heading -= system.angle
+        elif char == "|":
+            heading += 180
+    return points
+
+def checked_order(system):
+    """
+    Найменший порядок, рядок якого довший за два блоки, тож перевіряються і обхід, і блоки.
+    """
+    order = 0
+    while len(system.expand(order)) <= 2 * Task2.LSYSTEM_BLOCK_SYMBOLS:
+        order += 1
+    return order
+
+
+class TestLSystem(PointsTestCase):
+
+    def test_symbols_match_expansion(self):
+        for name, system in Task2.LSYSTEM_PRESETS.items():
+            for order in range(checked_order(system) + 1):
+                with self.subTest(preset=name, order=order):
+                    self.assertEqual("".join(system.iter_symbols(order)), system.expand(order))
+
+    def test_points_match_turtle(self):
+        for name, system in Task2.LSYSTEM_PRESETS.items():
+            for order in (0, 1, checked_order(system)):
+                with self.subTest(preset=name, order=order):
+                    expected = turtle_lsystem(system, system.expand(order), 2.5, 10.0, -4.0)
+                    self.assertPointsAlmostEqual(system.iter_points(order, 2.5, 10.0, -4.0), expected, len(expected))
+                    self.assertPointsAlmostEqual(pairs(system.points(order, 2.5, 10.0, -4.0)), expected, len(expected))
+
+    def test_koch_snowflake_preset(self):
+        system = Task2.LSYSTEM_PRESETS['koch-snowflake']
+        size = 300
+        for order in range(6):
+            with self.subTest(order=order):
+                points = system.points(order, size / 3**order, -size / 2, size / (2 * 3**0.5))
+                expected = Task2.koch_snowflake_points(order, size, Task2.KochCurveCache())
+                self.assertPointsAlmostEqual(pairs(points), pairs(expected), size)
+
+    def test_angle_must_divide_full_turn(self):
+        with self.assertRaises(ValueError):
+            Task2.LSystem("F", {"F": "F+F"}, 70)
+
+
+
+def read_png(data):
+    """
+    Розбирає PNG на (ширина, висота, розпаковані дані IDAT), перевіряючи підпис і CRC блоків.
+    """
+    assert data[:8] == b"\x89PNG\r\n\x1a\n", "невірний підпис PNG"
+    position = 8
+    chunks = []
+    while position < len(data):
+        length, = struct.unpack(">I", data[position:position + 4])
+        kind = data[position + 4:position + 8]
+        body = data[position + 8:position + 8 + length]
+        crc, = struct.unpack(">I", data[position + 8 + length:position + 12 + length])
+        assert crc == zlib.crc32(kind + body) & 0xffffffff, f"невірний CRC блоку {kind}"
+        chunks.append((kind, body))
+        position += 12 + length
+    assert chunks[0][0] == b"IHDR" and chunks[-1] == (b"IEND", b"")
+    width, height, depth, color = struct.unpack(">IIBB", chunks[0][1][:10])
+    assert (depth, color) == (8, 0)
+    pixels = zlib.decompress(b"".join(body for kind, body in chunks if kind == b"IDAT"))
+    return width, height, pixels
+
+
+class TestExport(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp(prefix="task2-test-")
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+
+    def test_svg_is_valid_xml(self):
+        out = io.StringIO()
+        points = list(Task2.iter_koch_snowflake_points(2, 300))
+        Task2.write_svg(out, points, Task2.default_viewport(300))
+        root = ET.fromstring(out.getvalue().encode("utf-8"))
+        self.assertEqual(root.tag, "{http://www.w3.org/2000/svg}svg")
+        path = root.find("{http://www.w3.org/2000/svg}path")
+        commands = path.get("d").split()
+        self.assertEqual(len(commands), 2 * len(points))
+        self.assertTrue(commands[0].startswith("M"))
+
+    def test_png_structure(self):
+        out = io.BytesIO()
+        viewport = (-100.0, -50.0, 100.0, 50.0)
+        Task2.write_png(out, [(-90.0, 0.0), (90.0, 0.0), (0.0, 40.0)], viewport, pixels=201)
+        width, height, pixels = read_png(out.getvalue())
+        self.assertEqual((width, height), (201, 101))
+        self.assertEqual(len(pixels), height * (width + 1))
+        rows = [pixels[row * (width + 1):(row + 1) * (width + 1)] for row in range(height)]
+        self.assertTrue(all(row[0] == 0 for row in rows))
+        # Горизонтальний відрізок y = 0 проходить серединою зображення
+        self.assertEqual(rows[50][1 + 10:1 + 191], b"\x00" * 181)
+        self.assertEqual(rows[0][1:], b"\xff" * width)
+
+    def test_export_formats(self):
+        svg_path = os.path.join(self.tmp, "snowflake.svg")
+        Task2.export_koch_snowflake(svg_path, 3)
+        ET.parse(svg_path)
+
+        png_path = os.path.join(self.tmp, "snowflake.dat")
+        Task2.export_koch_snowflake(png_path, 4, fmt="png", pixels=128)
+        with open(png_path, "rb") as f:
+            width, height, pixels = read_png(f.read())
+        self.assertEqual((width, height), (128, 128))
+        self.assertIn(0, pixels[1:])
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            Task2.export_koch_snowflake(os.path.join(self.tmp, "snowflake.bmp"), 2)
+        with self.assertRaises(ValueError):
+            Task2.export_koch_snowflake(os.path.join(self.tmp, "snowflake.svg"), 2, fmt="gif")
+        self.assertEqual(os.listdir(self.tmp), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from argparse import Namespace
+from collections import deque
+from contextlib import redirect_stdout
+from functools import partial
+from pathlib import Path
+
+import Task3
+
+
+def recursive_moves(n):
+    """
+    Збирає ходи рекурсивного розв'язку hanoi_recursive як трійки (диск, з вежі, на вежу).
+    """
+    pegs = {'A': list(range(n, 0, -1)), 'B': [], 'C': []}
+    moves = []
+
+    def move(from_peg, to_peg, pegs):
+        disk = pegs[from_peg].pop()
+        pegs[to_peg].append(disk)
+        moves.append((disk, from_peg, to_peg))
+
+    Task3.hanoi_recursive(n, 'A', 'C', 'B', pegs, move)
+    return moves
+
+def shortest_solution(n, pegs):
+    """
+    Мінімальна кількість ходів пошуком у ширину по всіх станах (лише для малих n).
+    """
+    start = tuple([0] * n)
+    goal = tuple([pegs - 1] * n)
+    seen = {start: 0}
+    queue = deque([start])
+    while queue:
+        state = queue.popleft()
+        if state == goal:
+            return seen[state]
+        # state[d] - вежа диска d + 1; верхній диск вежі - найменший з її дисків
+        tops = {}
+        for disk in range(n - 1, -1, -1):
+            tops[state[disk]] = disk
+        for from_peg, disk in tops.items():
+            for to_peg in range(pegs):
+                if to_peg != from_peg and tops.get(to_peg, n) > disk:
+                    following = state[:disk] + (to_peg,) + state[disk + 1:]
+                    if following not in seen:
+                        seen[following] = seen[state] + 1
+                        queue.append(following)
+    return None
+
+
+class TestThreePegs(unittest.TestCase):
+
+    def test_random_access_matches_recursion(self):
+        for n in range(9):
+            self.assertEqual(Task3.verify_random_access(n), 2**n - 1)
+
+    def test_generator_matches_recursion(self):
+        for n in range(9):
+            self.assertEqual(list(Task3.iter_hanoi_moves(n)), recursive_moves(n))
+
+    def test_recursion_prints_only_on_request(self):
+        pegs = {'A': [3, 2, 1], 'B': [], 'C': []}
+        with redirect_stdout(io.StringIO()) as stdout:
+            Task3.hanoi_recursive(3, 'A', 'C', 'B', pegs)
+        self.assertEqual(stdout.getvalue(), "")
+        self.assertEqual(pegs['C'], [3, 2, 1])
+
+        out = io.StringIO()
+        Task3.hanoi_recursive(3, 'C', 'A', 'B', pegs, partial(Task3.move_disk, out=out))
+        self.assertEqual(out.getvalue().splitlines()[0], "Перемістіть диск 1 з вежі C на вежу A.")
+        self.assertEqual(len(out.getvalue().splitlines()), 7)
+
+    def test_move_and_state_at(self):
+        n = 6
+        moves = list(Task3.iter_hanoi_moves(n))
+        state = Task3.PegState(n)
+        for k, move in enumerate(moves, 1):
+            self.assertEqual(Task3.hanoi_move_at(n, k), move)
+            state.apply_all([move])
+            self.assertEqual(Task3.hanoi_state_at(n, k), state.as_dict())
+        with self.assertRaises(ValueError):
+            Task3.hanoi_move_at(n, 2**n)
+
+    def test_hanoi_tower_func(self):
+        out = io.StringIO()
+        self.assertEqual(Task3.hanoi_tower_func(4, verbose=True, out=out), {'A': [], 'B': [], 'C': [4, 3, 2, 1]})
+        self.assertEqual(out.getvalue().count("Перемістіть диск"), 15)
+
+
+class TestMoveValidation(unittest.TestCase):
+
+    def test_valid_sequence(self):
+        state = Task3.validate_moves(7, Task3.iter_hanoi_moves(7))
+        self.assertEqual(state.moves, 127)
+        self.assertEqual(state.as_dict()['C'], list(range(7, 0, -1)))
+
+    def test_invalid_move_keeps_previous_state(self):
+        moves = [(1, 'A', 'C'), (2, 'A', 'C')]
+        state = Task3.PegState(3)
+        with self.assertRaises(ValueError):
+            state.apply_all(moves)
+        self.assertEqual(state.moves, 1)
+        self.assertEqual(state.as_dict(), {'A': [3, 2], 'B': [], 'C': [1]})
+
+
+class TestEncoding(unittest.TestCase):
+
+    def test_round_trip_in_chunks(self):
+        for n in range(12):
+            moves = list(Task3.iter_hanoi_moves(n))
+            chunks = list(Task3.encode_moves(moves, chunk_size=5))
+            self.assertTrue(all(len(chunk) == 5 for chunk in chunks[:-1]))
+            self.assertEqual(sum(map(len, chunks)), (len(moves) + 1) // 2)
+            self.assertEqual(list(Task3.decode_moves(chunks)), moves)
+            self.assertEqual(list(Task3.decode_moves(b"".join(chunks))), moves)
+
+    def test_binary_output(self):
+        tmp = Path(tempfile.mkdtemp(prefix="task3-test-"))
+        self.addCleanup(shutil.rmtree, tmp, ignore_errors=True)
+        output = os.fspath(tmp / "moves.bin")
+        args = Namespace(disks=10, pegs=3, output=output, format='binary', quiet=True)
+        self.assertEqual(Task3.run(args), 1023)
+        with open(output, "rb") as f:
+            self.assertEqual(Task3.validate_moves(10, Task3.decode_moves(f.read())).moves, 1023)
+
+
+class TestMultiplePegs(unittest.TestCase):
+
+    def test_table_matches_exhaustive_search(self):
+        table = Task3.FrameStewartTable(5, 5)
+        for pegs in (3, 4, 5):
+            for n in range(6):
+                self.assertEqual(table.moves[pegs][n], shortest_solution(n, pegs))
+
+    def test_moves_are_valid_and_minimal(self):
+        table = Task3.FrameStewartTable(12, 6)
+        for pegs in (4, 5, 6):
+            names = Task3.peg_names(pegs)
+            for n in range(13):
+                moves = list(Task3.iter_multipeg_moves(n, names, table))
+                self.assertEqual(len(moves), table.moves[pegs][n])
+                state = Task3.validate_moves(n, moves, pegs=names)
+                self.assertEqual(state.as_dict()['B'], list(range(n, 0, -1)))
+
+    def test_fewer_than_three_pegs(self):
+        with self.assertRaises(ValueError):
+            Task3.FrameStewartTable(3, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()